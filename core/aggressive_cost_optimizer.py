@@ -8,15 +8,29 @@ Quality: Maintain ≥80%
 """
 
 import os
+import re
 import json
-import hashlib
 import time
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
+
+# Operation names suggesting a reusable response worth saving as a template
+REUSABLE_KEYWORDS = ('template', 'format', 'structure', 'outline')
+_REUSABLE_RE = re.compile('|'.join(REUSABLE_KEYWORDS))
+
+# Cache files written before the cache was sharded (.cache/<md5>.json)
+_FLAT_CACHE_RE = re.compile(r'[0-9a-f]{32}\.json')
 
 class AggressiveCostOptimizer:
-    def __init__(self):
-        self.base_path = Path("/home/ubuntu/manus_global_knowledge")
+    # Initial tail window read by get_cost_stats; doubled until it spans the cutoff
+    TAIL_WINDOW_BYTES = 1024 * 1024
+    
+    # The cache entry count in reports is recounted at most every N seconds;
+    # entries this instance creates are added as they are written
+    CACHE_COUNT_TTL = 60
+    
+    def __init__(self, base_path: Path = Path("/home/ubuntu/manus_global_knowledge")):
+        self.base_path = Path(base_path)
         self.cache_dir = self.base_path / ".cache"
         self.cache_dir.mkdir(exist_ok=True)
         
@@ -36,17 +50,60 @@ class AggressiveCostOptimizer:
             'template_first': True,
             'local_validation_first': True
         }
+        
+        # Directory entry counts for reports, invalidated on directory mtime change
+        self._dir_counts = {}
+        
+        # Cache entry count for reports and when it was taken (monotonic)
+        self._cache_count = None
+        self._cache_counted_at = 0.0
+        
+        # Whether flat cache files have been moved into their shards yet
+        self._flat_cache_checked = False
+    
+    @staticmethod
+    def _cache_key(key: str) -> str:
+        """Hash a prompt into its cache file name"""
+        import hashlib  # Only needed on cache paths
+        return hashlib.md5(key.encode()).hexdigest()
+    
+    def _cache_file(self, cache_key: str) -> Path:
+        """Cache file path, sharded into 256 subdirectories by key prefix"""
+        return self.cache_dir / cache_key[:2] / f"{cache_key[2:]}.json"
+    
+    def _migrate_flat_cache(self):
+        """
+        Move cache files from before sharding into their shards
+        
+        Runs once per instance, before its first cache access; after the
+        first run it only lists the (at most 256) shard directories.
+        """
+        self._flat_cache_checked = True
+        with os.scandir(self.cache_dir) as entries:
+            flat = [entry.name for entry in entries
+                    if _FLAT_CACHE_RE.fullmatch(entry.name) and entry.is_file()]
+        
+        for name in flat:
+            cache_file = self._cache_file(name[:-5])
+            cache_file.parent.mkdir(exist_ok=True)
+            try:
+                if cache_file.exists():
+                    # Already saved again since sharding; that copy is newer
+                    os.unlink(self.cache_dir / name)
+                else:
+                    os.replace(self.cache_dir / name, cache_file)
+            except FileNotFoundError:
+                pass  # Moved by another process meanwhile
     
     def check_cache(self, key: str, ttl_days: int = None) -> tuple:
         """Check if cached response exists and is valid"""
         if ttl_days is None:
             ttl_days = self.rules['cache_ttl_days']
+        if not self._flat_cache_checked:
+            self._migrate_flat_cache()
         
-        cache_key = hashlib.md5(key.encode()).hexdigest()
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
-        if not cache_file.exists():
-            return (False, None, "Cache miss")
+        cache_key = self._cache_key(key)
+        cache_file = self._cache_file(cache_key)
         
         try:
             with open(cache_file, 'r') as f:
@@ -60,13 +117,19 @@ class AggressiveCostOptimizer:
             
             return (True, cached['data'], f"Cache hit ({age_days} days old)")
         
+        except FileNotFoundError:
+            return (False, None, "Cache miss")
+        
         except Exception as e:
             return (False, None, f"Cache error: {e}")
     
     def save_cache(self, key: str, data: any):
         """Save response to cache"""
-        cache_key = hashlib.md5(key.encode()).hexdigest()
-        cache_file = self.cache_dir / f"{cache_key}.json"
+        if not self._flat_cache_checked:
+            self._migrate_flat_cache()
+        cache_key = self._cache_key(key)
+        cache_file = self._cache_file(cache_key)
+        cache_file.parent.mkdir(exist_ok=True)
         
         cached = {
             'key': key,
@@ -74,8 +137,17 @@ class AggressiveCostOptimizer:
             'timestamp': datetime.now().isoformat()
         }
         
-        with open(cache_file, 'w') as f:
-            json.dump(cached, f, indent=2)
+        try:
+            f = open(cache_file, 'x')
+            created = True
+        except FileExistsError:
+            f = open(cache_file, 'w')
+            created = False
+        with f:
+            json.dump(cached, f, separators=(',', ':'))
+        
+        if created and self._cache_count is not None:
+            self._cache_count += 1
     
     def get_template(self, template_name: str) -> str:
         """Get template if exists"""
@@ -130,7 +202,7 @@ class AggressiveCostOptimizer:
     def log_cost(self, operation: str, cost: float, tokens: int, saved: float = 0):
         """Log cost for tracking"""
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'ts': time.time(),
             'operation': operation,
             'cost': cost,
             'tokens': tokens,
@@ -140,23 +212,73 @@ class AggressiveCostOptimizer:
         with open(self.cost_log, 'a') as f:
             f.write(json.dumps(log_entry) + '\n')
     
+    @staticmethod
+    def _entry_time(entry: dict) -> float:
+        """Epoch timestamp of a cost log entry"""
+        entry_time = entry.get('ts')
+        if entry_time is None:
+            # Legacy entries stored an ISO timestamp
+            entry_time = datetime.fromisoformat(entry['timestamp']).timestamp()
+        return entry_time
+    
+    def _read_tail_entries(self, cutoff: float) -> list:
+        """Read the log's tail, far enough back to cover every entry newer than cutoff"""
+        window = self.TAIL_WINDOW_BYTES
+        
+        with open(self.cost_log, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            
+            while True:
+                start = max(0, size - window)
+                f.seek(start)
+                lines = f.read().split(b'\n')
+                if start > 0:
+                    lines = lines[1:]  # Drop the partial first line
+                
+                entries = [json.loads(line) for line in lines if line.strip()]
+                
+                # Entries are append-ordered: once the window reaches past the
+                # cutoff (or covers the whole file) nothing older is needed
+                if start == 0 or (entries and self._entry_time(entries[0]) <= cutoff):
+                    return entries
+                
+                window *= 2
+    
     def get_cost_stats(self, days: int = 7) -> dict:
         """Get cost statistics"""
         if not self.cost_log.exists():
             return {'total_cost': 0, 'total_saved': 0, 'operations': 0}
         
-        cutoff = datetime.now() - timedelta(days=days)
+        cutoff = time.time() - days * 86400
         
-        total_cost = 0
-        total_saved = 0
-        operations = 0
+        entries = self._read_tail_entries(cutoff)
         
-        with open(self.cost_log, 'r') as f:
-            for line in f:
-                entry = json.loads(line)
-                entry_time = datetime.fromisoformat(entry['timestamp'])
-                
-                if entry_time > cutoff:
+        # NumPy is imported here, not at module load, to keep startup cheap
+        np = None
+        if entries:
+            try:
+                import numpy as np
+            except ImportError:
+                pass
+        
+        if np is not None:
+            count = len(entries)
+            ts = np.fromiter((self._entry_time(e) for e in entries), dtype=np.float64, count=count)
+            cost = np.fromiter((e['cost'] for e in entries), dtype=np.float64, count=count)
+            saved = np.fromiter((e['saved'] for e in entries), dtype=np.float64, count=count)
+            
+            mask = ts > cutoff
+            total_cost = float(cost[mask].sum())
+            total_saved = float(saved[mask].sum())
+            operations = int(mask.sum())
+        else:
+            total_cost = 0
+            total_saved = 0
+            operations = 0
+            
+            for entry in entries:
+                if self._entry_time(entry) > cutoff:
                     total_cost += entry['cost']
                     total_saved += entry['saved']
                     operations += 1
@@ -221,13 +343,38 @@ class AggressiveCostOptimizer:
         
         # Check if should save as template
         # (Simple heuristic: if operation name suggests reusability)
-        reusable_keywords = ['template', 'format', 'structure', 'outline']
-        if any(kw in operation.lower() for kw in reusable_keywords):
+        if _REUSABLE_RE.search(operation.lower()):
             self.save_template(operation, response)
         
         # Log cost
         self.log_cost(operation, actual_cost, len(response) // 4)
     
+    def _count_files(self, directory: Path, suffix: str) -> int:
+        """Count files with suffix in directory, cached until its mtime changes"""
+        mtime = directory.stat().st_mtime
+        cached = self._dir_counts.get(directory)
+        if cached is None or cached['mtime'] != mtime:
+            count = sum(1 for entry in directory.iterdir() if entry.suffix == suffix)
+            cached = {'mtime': mtime, 'count': count}
+            self._dir_counts[directory] = cached
+        return cached['count']
+    
+    def _count_cache_entries(self) -> int:
+        """Count cache entries across shard directories (see CACHE_COUNT_TTL)"""
+        now = time.monotonic()
+        if self._cache_count is None or now - self._cache_counted_at > self.CACHE_COUNT_TTL:
+            if not self._flat_cache_checked:
+                self._migrate_flat_cache()
+            count = 0
+            with os.scandir(self.cache_dir) as shards:
+                for shard in shards:
+                    if shard.is_dir():
+                        with os.scandir(shard.path) as entries:
+                            count += sum(1 for entry in entries if entry.name.endswith('.json'))
+            self._cache_count = count
+            self._cache_counted_at = now
+        return self._cache_count
+    
     def generate_cost_report(self) -> str:
         """Generate cost optimization report"""
         stats = self.get_cost_stats(days=7)
@@ -242,8 +389,8 @@ class AggressiveCostOptimizer:
 ║  Savings Rate:      {stats['savings_rate']:.1f}%                                                ║
 ╠══════════════════════════════════════════════════════════════════════════════╣
 ║  Optimization Status:                                                        ║
-║    ✓ Cache enabled ({len(list(self.cache_dir.glob('*.json')))} entries)                                         ║
-║    ✓ Templates enabled ({len(list(self.templates_dir.glob('*.md')))} templates)                                   ║
+║    ✓ Cache enabled ({self._count_cache_entries()} entries)                                         ║
+║    ✓ Templates enabled ({self._count_files(self.templates_dir, '.md')} templates)                                   ║
 ║    ✓ Prompt optimization active                                             ║
 ║    ✓ Cost tracking active                                                    ║
 ╚══════════════════════════════════════════════════════════════════════════════╝
@@ -6,13 +6,7 @@ Provides workflow for searching and using academic papers from Anna's Archive
 MANDATORY: Use this workflow for ALL academic research
 """
 
-import os
-import sys
-
-def print_annas_archive_workflow():
-    """Print the Anna's Archive workflow guide"""
-    
-    workflow = """
+ANNAS_ARCHIVE_WORKFLOW = """
 ╔══════════════════════════════════════════════════════════════════════════════╗
 ║                    📚 ANNA'S ARCHIVE WORKFLOW                                ║
 ╠══════════════════════════════════════════════════════════════════════════════╣
@@ -315,8 +309,10 @@ the test of time.
 
 **"Knowledge is power. Free knowledge is unstoppable."**
 """
-    
-    return workflow
+
+def print_annas_archive_workflow():
+    """Print the Anna's Archive workflow guide"""
+    return ANNAS_ARCHIVE_WORKFLOW
 
 def main():
     """Print the workflow"""
@@ -14,17 +14,127 @@ Usage:
     python3 api_key_manager.py load      # Load keys into environment
     python3 api_key_manager.py validate  # Test all keys
     python3 api_key_manager.py update APOLLO_API_KEY new_value
+    python3 api_key_manager.py update APOLLO_API_KEY=v1 OPENAI_API_KEY=v2
+
+Optional: install rfernet for faster (Rust-backed) Fernet encrypt/decrypt;
+tokens are interchangeable with cryptography's Fernet. Install keyring to
+cache the derived encryption key in the OS keyring across invocations.
+
+Secrets are saved as Fernet tokens, which every version can read. Setting
+MANUS_SECRETS_BINARY=true (or APIKeyManager.BINARY_FORMAT) writes a smaller,
+faster raw binary format (versioned "MSEC" header) instead; only do so once
+all readers of the secrets file include this version, as older ones cannot
+decrypt it.
 """
 
 import os
 import sys
 import json
+import atexit
+import shlex
 import base64
+import shutil
+import socket
+import hmac
 import hashlib
+import functools
+import time
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Tuple
-from cryptography.fernet import Fernet
+
+# requests/urllib3 and cryptography are imported where they are used (key
+# validation, encryption), so CLI commands that need neither skip them
+
+
+class _RFernet:
+    """Rust-backed rfernet with cryptography.Fernet's bytes-in/bytes-out API"""
+    
+    def __init__(self, key: bytes):
+        import rfernet
+        self._fernet = rfernet.Fernet(key.decode() if isinstance(key, bytes) else key)
+    
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data).encode()
+    
+    def decrypt(self, token: bytes) -> bytes:
+        return self._fernet.decrypt(token.decode())
+
+
+@functools.lru_cache(maxsize=1)
+def _fernet_class():
+    """Fernet implementation: rfernet if installed, else cryptography's"""
+    try:
+        import rfernet  # noqa: F401
+        return _RFernet
+    except ImportError:
+        from cryptography.fernet import Fernet
+        return Fernet
+
+try:
+    import orjson
+    
+    def _dumps(obj) -> bytes:
+        """Compact JSON encoding"""
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        """Compact JSON encoding"""
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+
+# (epoch second, ISO text) of the last second formatted by _iso_now
+_iso_second = (None, '')
+
+def _iso_now() -> str:
+    """
+    Local ISO-8601 timestamp with microseconds
+    
+    The date/time part is formatted once per second; bursts of audit
+    entries only format the microsecond suffix.
+    """
+    global _iso_second
+    now = time.time()
+    second = int(now)
+    if second != _iso_second[0]:
+        _iso_second = (second, datetime.fromtimestamp(second).isoformat())
+    return f"{_iso_second[1]}.{int((now - second) * 1_000_000):06d}"
+
+
+@functools.lru_cache(maxsize=1)
+def _derive_key(seed: str, iterations: int) -> bytes:
+    """
+    Derive a Fernet key from seed using PBKDF2-HMAC-SHA256
+    
+    Cached per process: the seed is fixed for a sandbox, so repeated
+    APIKeyManager instances reuse the derived key.
+    """
+    # Fixed salt (acceptable for this use case as seed is already unique per sandbox)
+    salt = b'manus-secrets-salt-v1'
+    
+    # OpenSSL-backed PBKDF2 from the stdlib; 32 bytes = 256 bits
+    key_material = hashlib.pbkdf2_hmac('sha256', seed.encode(), salt, iterations, dklen=32)
+    
+    # Encode for Fernet (base64)
+    return base64.urlsafe_b64encode(key_material)
+
+
+def _secure_keyring():
+    """
+    The keyring module if it is installed and backed by a real OS keyring
+    
+    Low-priority backends (keyrings.alt's plaintext and password-prompting
+    file stores, or the fail backend) are refused: they would either put
+    the key back on disk in the clear or block on a prompt.
+    """
+    try:
+        import keyring
+        if getattr(keyring.get_keyring(), 'priority', 0) < 1:
+            return None
+    except Exception:
+        return None
+    return keyring
 
 
 class APIKeyManager:
@@ -38,6 +148,26 @@ class APIKeyManager:
         # Add more as needed
     ]
     
+    # PBKDF2 iterations (NIST SP 800-132 recommendation). The seed is already
+    # machine-unique, so deployments may lower this; doing so changes the key
+    # and requires re-saving existing secrets.
+    KDF_ITERATIONS = 100000
+    
+    # Opt-in raw (non-base64) AES-128-CBC + HMAC-SHA256 secrets format,
+    # written under MAGIC + version byte. Off by default: versions without
+    # _decrypt's binary support cannot read it, so only enable it once every
+    # reader of the secrets file is updated (MANUS_SECRETS_BINARY=true).
+    # Both formats are always readable.
+    BINARY_FORMAT = os.environ.get('MANUS_SECRETS_BINARY', 'false').lower() == 'true'
+    BINARY_MAGIC = b'MSEC'
+    BINARY_VERSION = 1
+    
+    # Model fetched by the OpenAI key check (any model id works for auth)
+    OPENAI_PROBE_MODEL = 'gpt-4o-mini'
+    
+    # Buffered audit entries are flushed once this many are pending (and at exit)
+    AUDIT_FLUSH_THRESHOLD = 64
+    
     def __init__(self):
         """Initialize API Key Manager"""
         self.home = Path.home()
@@ -45,43 +175,121 @@ class APIKeyManager:
         self.backup_dir = self.home / '.manus_secrets_backup'
         self.backup_dir.mkdir(exist_ok=True)
         self.audit_log = self.home / '.manus_secrets_audit.jsonl'
+        # Plaintext key cache written by earlier versions, removed on sight
+        self.legacy_key_cache = self.home / '.manus_secrets.keycache'
+        
+        # Audit entries are buffered and written in one batch
+        self._audit_buffer = []
+        atexit.register(self._flush_audit)
         
-        # Generate encryption key from sandbox-specific data
-        self.encryption_key = self._generate_encryption_key()
-        self.cipher = Fernet(self.encryption_key)
+        # HTTP session for key validation, created on first use
+        self._session = None
+    
+    @functools.cached_property
+    def encryption_key(self) -> bytes:
+        """Encryption key from sandbox-specific data, derived on first use"""
+        return self._generate_encryption_key()
+    
+    @functools.cached_property
+    def cipher(self):
+        """Fernet cipher for legacy-format secrets files, built on first use"""
+        return _fernet_class()(self.encryption_key)
     
     def _generate_encryption_key(self) -> bytes:
         """
         Generate encryption key from sandbox-specific identifier using PBKDF2
         
-        Uses PBKDF2-HMAC-SHA256 with 100,000 iterations (NIST recommendation)
-        to derive a strong encryption key from sandbox-specific data.
+        Uses PBKDF2-HMAC-SHA256 with KDF_ITERATIONS iterations to derive a
+        strong encryption key from sandbox-specific data. The derived key is
+        cached in-process and, when the keyring package is installed, in the
+        OS keyring so later CLI invocations skip the derivation. It is never
+        written to a file next to the secrets.
         
         Returns:
             Encryption key bytes
         """
         # Use hostname + user as seed (sandbox-specific)
-        import socket
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-        
         seed = f"{socket.gethostname()}-{os.getuid()}-manus-secrets"
         
-        # Fixed salt (acceptable for this use case as seed is already unique per sandbox)
-        salt = b'manus-secrets-salt-v1'
+        # Key cache is only valid for the seed and iteration count it was derived from
+        fingerprint = hashlib.sha256(f"{seed}:{self.KDF_ITERATIONS}".encode()).hexdigest()
+        
+        try:
+            self.legacy_key_cache.unlink()
+        except OSError:
+            pass
+        
+        keyring = _secure_keyring()
+        if keyring is not None:
+            try:
+                cached_key = keyring.get_password('manus-secrets', fingerprint)
+                if cached_key:
+                    return cached_key.encode()
+            except Exception:
+                # No usable keyring backend; the cache is an optimization only
+                keyring = None
+        
+        key = _derive_key(seed, self.KDF_ITERATIONS)
+        
+        if keyring is not None:
+            try:
+                keyring.set_password('manus-secrets', fingerprint, key.decode())
+            except Exception:
+                pass
+        
+        return key
+    
+    def _encrypt(self, data: bytes) -> bytes:
+        """
+        Encrypt data for the secrets file
+        
+        Legacy Fernet token unless BINARY_FORMAT is set. Binary layout:
+        MAGIC || VERSION (1) || IV (16) || ciphertext || HMAC-SHA256 (32), with
+        the same primitives and key split as Fernet, minus the base64 armor.
+        """
+        if not self.BINARY_FORMAT:
+            return self.cipher.encrypt(data)
+        
+        from cryptography.hazmat.primitives import padding
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
         
-        # Use PBKDF2 with 100,000 iterations (NIST SP 800-132 recommendation)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,  # 32 bytes = 256 bits
-            salt=salt,
-            iterations=100000,
-        )
+        key = base64.urlsafe_b64decode(self.encryption_key)
+        signing_key, encryption_key = key[:16], key[16:]
         
-        key_material = kdf.derive(seed.encode())
+        iv = os.urandom(16)
+        padder = padding.PKCS7(128).padder()
+        padded = padder.update(data) + padder.finalize()
+        encryptor = Cipher(algorithms.AES(encryption_key), modes.CBC(iv)).encryptor()
         
-        # Encode for Fernet (base64)
-        return base64.urlsafe_b64encode(key_material)
+        header = self.BINARY_MAGIC + bytes([self.BINARY_VERSION])
+        body = header + iv + encryptor.update(padded) + encryptor.finalize()
+        return body + hmac.new(signing_key, body, hashlib.sha256).digest()
+    
+    def _decrypt(self, blob: bytes) -> bytes:
+        """Decrypt the secrets file, accepting binary and legacy Fernet formats"""
+        if not blob.startswith(self.BINARY_MAGIC):
+            return self.cipher.decrypt(blob)
+        
+        header_len = len(self.BINARY_MAGIC) + 1
+        version = blob[header_len - 1] if len(blob) >= header_len else None
+        if version != self.BINARY_VERSION:
+            raise ValueError(f"Unsupported secrets file format version: {version}")
+        
+        from cryptography.hazmat.primitives import padding
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        
+        key = base64.urlsafe_b64decode(self.encryption_key)
+        signing_key, encryption_key = key[:16], key[16:]
+        
+        body, tag = blob[:-32], blob[-32:]
+        if not hmac.compare_digest(tag, hmac.new(signing_key, body, hashlib.sha256).digest()):
+            raise ValueError("Secrets file failed integrity check")
+        
+        iv = body[header_len:header_len + 16]
+        decryptor = Cipher(algorithms.AES(encryption_key), modes.CBC(iv)).decryptor()
+        padded = decryptor.update(body[header_len + 16:]) + decryptor.finalize()
+        unpadder = padding.PKCS7(128).unpadder()
+        return unpadder.update(padded) + unpadder.finalize()
     
     def _log_access(self, operation: str, success: bool, **metadata):
         """
@@ -92,10 +300,8 @@ class APIKeyManager:
             success: Whether operation succeeded
             **metadata: Additional metadata to log
         """
-        import socket
-        
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _iso_now(),
             'operation': operation,
             'success': success,
             'user': os.getenv('USER', 'unknown'),
@@ -103,18 +309,50 @@ class APIKeyManager:
             **metadata
         }
         
+        self._audit_buffer.append(_dumps(log_entry) + b'\n')
+        
+        # Long-running processes flush periodically; short CLI runs flush at exit
+        if len(self._audit_buffer) > self.AUDIT_FLUSH_THRESHOLD:
+            self._flush_audit()
+    
+    def _flush_audit(self):
+        """Write buffered audit entries to the audit log in one append"""
+        if not self._audit_buffer:
+            return
+        
+        lines, self._audit_buffer = self._audit_buffer, []
+        
         try:
+            is_new = not self.audit_log.exists()
+            
             # Append to audit log
-            with open(self.audit_log, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            with open(self.audit_log, 'ab') as f:
+                f.writelines(lines)
             
             # Set permissions on first write
-            if self.audit_log.stat().st_size == len(json.dumps(log_entry)) + 1:
+            if is_new:
                 os.chmod(self.audit_log, 0o600)
         except Exception:
             # Don't fail operation if logging fails
             pass
     
+    def _write_atomic(self, path: Path, data: bytes):
+        """
+        Replace path with data without exposing a partial or world-readable file
+        
+        Writes a 0600 temp file next to path, then renames it over path.
+        """
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
     def save_keys(self, keys: Optional[Dict[str, str]] = None) -> Tuple[bool, str]:
         """
         Save API keys to encrypted file
@@ -145,16 +383,13 @@ class APIKeyManager:
             }
             
             # Serialize to JSON
-            json_data = json.dumps(data)
+            json_data = _dumps(data)
             
             # Encrypt
-            encrypted_data = self.cipher.encrypt(json_data.encode())
+            encrypted_data = self._encrypt(json_data)
             
-            # Write to file
-            self.secrets_file.write_bytes(encrypted_data)
-            
-            # Set restrictive permissions
-            os.chmod(self.secrets_file, 0o600)
+            # Write to file atomically, created with restrictive permissions
+            self._write_atomic(self.secrets_file, encrypted_data)
             
             # Log successful save
             self._log_access('save', True, keys_saved=len(keys), key_names=list(keys.keys()))
@@ -181,10 +416,10 @@ class APIKeyManager:
             encrypted_data = self.secrets_file.read_bytes()
             
             # Decrypt
-            decrypted_data = self.cipher.decrypt(encrypted_data)
+            decrypted_data = self._decrypt(encrypted_data)
             
             # Parse JSON
-            data = json.loads(decrypted_data.decode())
+            data = json.loads(decrypted_data)
             
             keys = data.get('keys', {})
             timestamp = data.get('timestamp', 'unknown')
@@ -199,23 +434,23 @@ class APIKeyManager:
             self._log_access('load', False, error=str(e))
             return (False, {}, f"Error loading keys: {e}")
     
-    def load_keys_to_environment(self) -> Tuple[bool, str]:
+    def load_keys_to_environment(self) -> Tuple[bool, Dict[str, str], str]:
         """
         Load keys from file and set as environment variables
         
         Returns:
-            (success, message)
+            (success, keys_dict, message)
         """
         success, keys, msg = self.load_keys()
         
         if not success:
-            return (False, msg)
+            return (False, {}, msg)
         
         # Set environment variables
         for key_name, value in keys.items():
             os.environ[key_name] = value
         
-        return (True, f"Loaded {len(keys)} keys into environment")
+        return (True, keys, f"Loaded {len(keys)} keys into environment")
     
     def update_key(self, key_name: str, value: str) -> Tuple[bool, str]:
         """
@@ -225,6 +460,18 @@ class APIKeyManager:
             key_name: Name of the key (e.g., 'APOLLO_API_KEY')
             value: New value
             
+        Returns:
+            (success, message)
+        """
+        return self.bulk_update({key_name: value})
+    
+    def bulk_update(self, updates: Dict[str, str]) -> Tuple[bool, str]:
+        """
+        Update several API keys with a single decrypt and re-encrypt
+        
+        Args:
+            updates: Dict of key names to new values
+            
         Returns:
             (success, message)
         """
@@ -234,8 +481,8 @@ class APIKeyManager:
         if not success:
             keys = {}
         
-        # Update key
-        keys[key_name] = value
+        # Update keys
+        keys.update(updates)
         
         # Save
         return self.save_keys(keys)
@@ -255,29 +502,59 @@ class APIKeyManager:
         if not success:
             return {'error': {'valid': False, 'message': msg}}
         
-        # Validate each key
-        for key_name, value in keys.items():
-            if key_name == 'OPENAI_API_KEY':
-                results[key_name] = self._validate_openai_key(value)
-            elif key_name == 'APOLLO_API_KEY':
-                results[key_name] = self._validate_apollo_key(value)
-            else:
-                results[key_name] = {'valid': True, 'message': 'No validation available'}
+        if not keys:
+            return results
+        
+        # Validate keys concurrently; each check is a blocking HTTP round trip
+        with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+            validated = executor.map(lambda item: self._validate_key(*item), keys.items())
+            for key_name, result in zip(keys, validated):
+                results[key_name] = result
         
         return results
     
+    def _validate_key(self, key_name: str, value: str) -> Dict[str, any]:
+        """Dispatch a key to its validator"""
+        if key_name == 'OPENAI_API_KEY':
+            return self._validate_openai_key(value)
+        elif key_name == 'APOLLO_API_KEY':
+            return self._validate_apollo_key(value)
+        else:
+            return {'valid': True, 'message': 'No validation available'}
+    
+    def _get_session(self):
+        """HTTP session shared by validators so connections are reused"""
+        if self._session is None:
+            try:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+            except ImportError:
+                raise ImportError("requests is required for key validation")
+            
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=4,
+                max_retries=Retry(total=1, backoff_factor=0.3)
+            )
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+    
     def _validate_openai_key(self, api_key: str) -> Dict[str, any]:
         """Validate OpenAI API key"""
         try:
-            import requests
-            
-            response = requests.get(
-                'https://api.openai.com/v1/models',
+            # Retrieve a single model rather than listing all of them: the
+            # auth check is identical but the response body is tiny
+            response = self._get_session().get(
+                f'https://api.openai.com/v1/models/{self.OPENAI_PROBE_MODEL}',
                 headers={'Authorization': f'Bearer {api_key}'},
                 timeout=10
             )
             
-            if response.status_code == 200:
+            # 404 means the key authenticated but cannot see the probe model
+            if response.status_code in (200, 404):
                 return {'valid': True, 'message': 'OpenAI API key is valid'}
             elif response.status_code == 401:
                 return {'valid': False, 'message': 'OpenAI API key is invalid'}
@@ -290,9 +567,7 @@ class APIKeyManager:
     def _validate_apollo_key(self, api_key: str) -> Dict[str, any]:
         """Validate Apollo API key"""
         try:
-            import requests
-            
-            response = requests.get(
+            response = self._get_session().get(
                 'https://api.apollo.io/v1/auth/health',
                 headers={'X-Api-Key': api_key},
                 timeout=10
@@ -326,7 +601,6 @@ class APIKeyManager:
             backup_file = self.backup_dir / f'secrets_backup_{timestamp}.enc'
             
             # Copy encrypted file
-            import shutil
             shutil.copy2(self.secrets_file, backup_file)
             
             # Set permissions
@@ -354,7 +628,6 @@ class APIKeyManager:
                 return (False, f"Backup file not found: {backup_file}")
             
             # Copy backup to secrets file
-            import shutil
             shutil.copy2(backup_path, self.secrets_file)
             
             # Set permissions
@@ -388,6 +661,7 @@ def main():
         print("  load                    - Load keys into environment")
         print("  validate                - Validate all saved keys")
         print("  update <key> <value>    - Update a specific key")
+        print("  update K1=v1 [K2=v2..]  - Update several keys at once")
         print("  backup                  - Create a backup")
         print("  restore <backup_file>   - Restore from backup")
         print("  list-backups            - List all backups")
@@ -401,14 +675,12 @@ def main():
         sys.exit(0 if success else 1)
     
     elif command == 'load':
-        success, msg = manager.load_keys_to_environment()
+        success, keys, msg = manager.load_keys_to_environment()
         print(msg)
         
-        if success:
-            # Print export commands for shell sourcing
-            _, keys, _ = manager.load_keys()
-            for key_name, value in keys.items():
-                print(f"export {key_name}='{value}'")
+        # Print export commands for shell sourcing
+        for key_name, value in keys.items():
+            print(f"export {key_name}={shlex.quote(value)}")
         
         sys.exit(0 if success else 1)
     
@@ -431,14 +703,19 @@ def main():
         sys.exit(0 if all_valid else 1)
     
     elif command == 'update':
-        if len(sys.argv) < 4:
+        args = sys.argv[2:]
+        
+        if len(args) == 2 and '=' not in args[0]:
+            # Legacy form: update <key> <value>
+            updates = {args[0]: args[1]}
+        elif args and all('=' in arg for arg in args):
+            updates = dict(arg.split('=', 1) for arg in args)
+        else:
             print("Usage: python3 api_key_manager.py update <key> <value>")
+            print("       python3 api_key_manager.py update KEY1=value1 [KEY2=value2 ...]")
             sys.exit(1)
         
-        key_name = sys.argv[2]
-        value = sys.argv[3]
-        
-        success, msg = manager.update_key(key_name, value)
+        success, msg = manager.bulk_update(updates)
         print(msg)
         sys.exit(0 if success else 1)
     
@@ -7,9 +7,27 @@ Integrates with Manus Global Knowledge System
 
 import os
 import json
+import heapq
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+
+# Report frame, built once (78 columns between the borders)
+REPORT_WIDTH = 78
+ROW = "║{:<78}║"
+# Rows containing one double-width emoji get one less column of padding
+WIDE_ROW = "║{:<77}║"
+_SEP = "═" * REPORT_WIDTH
+_TOP = "╔" + _SEP + "╗"
+_MID = "╠" + _SEP + "╣"
+_BOT = "╚" + _SEP + "╝"
+_BLANK = ROW.format("")
+_TITLE = "║{:^77}║".format("💰 CONVERSATION COST REPORT")
+_SUMMARY = WIDE_ROW.format("  📊 SUMMARY")
+_SAVINGS_NOTE = ROW.format("       vs using search+browser for research")
+_TOP_OPS = WIDE_ROW.format("  🔧 TOP OPERATIONS")
+_PRINCIPLE = WIDE_ROW.format("  Principle P3: Always Optimize Cost ✅")
 
 class AutoCostReporter:
     """Automatic cost reporting system"""
@@ -31,33 +49,59 @@ class AutoCostReporter:
         'message': 0.0,
     }
     
+    # Reports directory is created once per process
+    _dirs_ensured = False
+    
     def __init__(self):
         self.base_path = Path("/home/ubuntu/manus_global_knowledge")
         self.reports_dir = self.base_path / "metrics" / "cost_reports"
-        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        if not AutoCostReporter._dirs_ensured:
+            self.reports_dir.mkdir(parents=True, exist_ok=True)
+            AutoCostReporter._dirs_ensured = True
         
         # Track operations in this session
-        self.operations = {}
+        self.operations = Counter()
         self.openai_usage = {
             'calls': 0,
             'total_tokens': 0,
             'total_cost_usd': 0.0
         }
         
+        # Cached calculate_costs/calculate_savings results, reset on new usage
+        self._dirty = True
+        self._costs_cache = None
+        self._savings_cache = None
+        
     def log_operation(self, tool: str, count: int = 1):
         """Log an operation"""
-        if tool not in self.operations:
-            self.operations[tool] = 0
         self.operations[tool] += count
+        self._dirty = True
         
     def log_openai(self, tokens: int, cost_usd: float):
         """Log OpenAI usage"""
         self.openai_usage['calls'] += 1
         self.openai_usage['total_tokens'] += tokens
         self.openai_usage['total_cost_usd'] += cost_usd
+        self._dirty = True
         
+    def _refresh(self):
+        """Recompute cached costs and savings if usage changed since last time"""
+        if self._dirty:
+            self._costs_cache = self._calculate_costs()
+            self._savings_cache = self._calculate_savings()
+            self._dirty = False
+    
     def calculate_costs(self) -> Dict:
         """Calculate total costs"""
+        self._refresh()
+        return self._costs_cache
+    
+    def calculate_savings(self) -> Dict:
+        """Calculate cost savings from optimization"""
+        self._refresh()
+        return self._savings_cache
+    
+    def _calculate_costs(self) -> Dict:
         manus_total = 0
         breakdown = {}
         
@@ -81,8 +125,7 @@ class AutoCostReporter:
             'breakdown': breakdown
         }
     
-    def calculate_savings(self) -> Dict:
-        """Calculate cost savings from optimization"""
+    def _calculate_savings(self) -> Dict:
         # Estimate savings from using OpenAI instead of search+browser
         openai_calls = self.openai_usage['calls']
         if openai_calls > 0:
@@ -103,60 +146,67 @@ class AutoCostReporter:
     
     def generate_compact_report(self) -> str:
         """Generate compact ASCII art cost report"""
+        return "\n".join(self._iter_report_lines())
+    
+    def _iter_report_lines(self) -> Iterator[str]:
+        """Yield the lines of the compact cost report"""
         costs = self.calculate_costs()
         savings = self.calculate_savings()
         
-        report = []
-        report.append("╔" + "═" * 78 + "╗")
-        report.append("║" + " " * 20 + "💰 CONVERSATION COST REPORT" + " " * 31 + "║")
-        report.append("╠" + "═" * 78 + "╣")
-        report.append("║" + " " * 78 + "║")
+        yield _TOP
+        yield _TITLE
+        yield _MID
+        yield _BLANK
         
         # Summary
-        report.append("║  📊 SUMMARY" + " " * 65 + "║")
-        report.append("║" + " " * 78 + "║")
-        report.append(f"║    Total Cost:        ${costs['total_usd']:.4f} USD" + " " * 44 + "║")
-        report.append(f"║      ├─ Manus:        ${costs['manus_usd']:.4f} USD ({costs['manus_credits']:.1f} credits)" + " " * 27 + "║")
+        yield _SUMMARY
+        yield _BLANK
+        yield ROW.format(f"    Total Cost:        ${costs['total_usd']:.4f} USD")
+        yield ROW.format(f"      ├─ Manus:        ${costs['manus_usd']:.4f} USD ({costs['manus_credits']:.1f} credits)")
         
         if costs['openai_calls'] > 0:
-            report.append(f"║      └─ OpenAI:       ${costs['openai_usd']:.4f} USD ({costs['openai_tokens']} tokens)" + " " * 24 + "║")
+            yield ROW.format(f"      └─ OpenAI:       ${costs['openai_usd']:.4f} USD ({costs['openai_tokens']} tokens)")
         
-        report.append("║" + " " * 78 + "║")
+        yield _BLANK
         
         if savings['savings'] > 0:
-            report.append(f"║    💎 Savings:        {savings['savings']:.1f} credits ({savings['rate']:.1f}% saved)" + " " * 29 + "║")
-            report.append("║       vs using search+browser for research" + " " * 35 + "║")
-            report.append("║" + " " * 78 + "║")
+            yield WIDE_ROW.format(f"    💎 Savings:        {savings['savings']:.1f} credits ({savings['rate']:.1f}% saved)")
+            yield _SAVINGS_NOTE
+            yield _BLANK
         
         # Breakdown (top 5)
         if costs['breakdown']:
-            report.append("║  🔧 TOP OPERATIONS" + " " * 59 + "║")
-            report.append("║" + " " * 78 + "║")
+            yield _TOP_OPS
+            yield _BLANK
             
-            sorted_ops = sorted(costs['breakdown'].items(), key=lambda x: x[1]['cost'], reverse=True)[:5]
+            sorted_ops = heapq.nlargest(5, costs['breakdown'].items(), key=lambda x: x[1]['cost'])
             for op, data in sorted_ops:
                 op_name = op.replace('_', ' ').title()
-                line = f"║    {op_name:20s} {data['count']:3d}x  →  {data['cost']:6.1f} credits"
-                padding = 78 - len(line) + 1
-                report.append(line + " " * padding + "║")
+                line = f"    {op_name:20s} {data['count']:3d}x  →  {data['cost']:6.1f} credits"
+                yield ROW.format(line)
             
-            report.append("║" + " " * 78 + "║")
+            yield _BLANK
         
         # Footer
-        report.append("╠" + "═" * 78 + "╣")
-        report.append(f"║  Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}" + " " * 46 + "║")
-        report.append("║  Principle P3: Always Optimize Cost ✅" + " " * 38 + "║")
-        report.append("╚" + "═" * 78 + "╝")
-        
-        return "\n".join(report)
+        yield _MID
+        yield ROW.format(f"  Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        yield _PRINCIPLE
+        yield _BOT
     
-    def save_report(self, report: str) -> Path:
-        """Save report to file"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    def save_report(self, report: Optional[str] = None) -> Path:
+        """Save report to file (streamed from the generator if report is None)"""
+        # One clock read so the .txt, .json and recorded timestamp agree
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         report_file = self.reports_dir / f"cost_report_{timestamp}.txt"
         
         with open(report_file, 'w') as f:
-            f.write(report)
+            if report is None:
+                lines = self._iter_report_lines()
+                f.write(next(lines))
+                f.writelines("\n" + line for line in lines)
+            else:
+                f.write(report)
             
         # Also save JSON for analysis
         costs = self.calculate_costs()
@@ -165,7 +215,7 @@ class AutoCostReporter:
         json_file = self.reports_dir / f"cost_report_{timestamp}.json"
         with open(json_file, 'w') as f:
             json.dump({
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'costs': costs,
                 'savings': savings,
                 'operations': self.operations,
@@ -237,8 +287,7 @@ def generate_report() -> str:
 def save_report() -> Path:
     """Generate and save cost report"""
     reporter = get_reporter()
-    report = reporter.generate_compact_report()
-    return reporter.save_report(report)
+    return reporter.save_report()
 
 
 if __name__ == "__main__":
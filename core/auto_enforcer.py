@@ -7,20 +7,20 @@ and enforce all operations without requiring manual initialization.
 
 Strategy:
 1. Install as a .pth file in Python's site-packages
-2. Auto-execute on Python interpreter startup
-3. Monkey-patch Manus operations before they're used
-4. Transparent to the user - works automatically
+2. On startup, register a lazy import hook (core/manus_lazy_loader.py)
+3. Activate on the first import of a Manus module
+4. Monkey-patch Manus operations before they're used
+5. Transparent to the user - works automatically
 
 Author: Manus Global Knowledge System v2.0
 """
 
 import sys
-import os
+import threading
+import importlib.util
 from pathlib import Path
 import logging
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("AutoEnforcer")
 
 # Base path
@@ -31,6 +31,8 @@ def install_auto_enforcer():
     Install the auto-enforcer into Python's startup sequence.
     
     This creates a .pth file that executes on every Python interpreter start.
+    The .pth only registers a meta path finder; enforcement is activated the
+    first time a Manus module is imported.
     """
     import site
     
@@ -38,16 +40,22 @@ def install_auto_enforcer():
     site_packages = site.getsitepackages()[0]
     pth_file = Path(site_packages) / "manus_auto_enforcer.pth"
     
-    # Content to execute on startup
-    startup_code = f"""import sys; sys.path.insert(0, '{BASE_PATH}'); from core.auto_enforcer import activate_enforcement; activate_enforcement()"""
+    # Content to execute on startup. The loader is loaded straight from its
+    # file so that every interpreter does not get BASE_PATH on sys.path.
+    loader_path = BASE_PATH / "core" / "manus_lazy_loader.py"
+    startup_code = (
+        "import importlib.util as _u; "
+        f"_s = _u.spec_from_file_location('manus_lazy_loader', '{loader_path}'); "
+        "_m = _u.module_from_spec(_s); _s.loader.exec_module(_m); _m.install()"
+    )
     
     try:
         with open(pth_file, 'w') as f:
             f.write(startup_code)
-        logger.info(f"✅ Auto-enforcer installed: {pth_file}")
+        logger.info("✅ Auto-enforcer installed: %s", pth_file)
         return True
     except Exception as e:
-        logger.error(f"❌ Failed to install auto-enforcer: {e}")
+        logger.error("❌ Failed to install auto-enforcer: %s", e)
         return False
 
 
@@ -55,19 +63,17 @@ def activate_enforcement():
     """
     Activate enforcement by monkey-patching Manus operations.
     
-    This is called automatically when Python starts.
+    This is called automatically on the first import of a Manus module.
     """
+    # Configure logging only once enforcement is actually switched on,
+    # not for every module that merely imports this one
+    logging.basicConfig(level=logging.INFO)
+    
     try:
-        # Add to path if not already there
-        if str(BASE_PATH) not in sys.path:
-            sys.path.insert(0, str(BASE_PATH))
-        
-        # Import enforcement pipeline
-        from core.unified_enforcement import UnifiedEnforcementPipeline
-        
-        # Initialize pipeline
-        global _ENFORCEMENT_PIPELINE
-        _ENFORCEMENT_PIPELINE = UnifiedEnforcementPipeline(BASE_PATH)
+        # The pipeline itself is built on the first enforce_before_operation()
+        # call, keeping its imports off the activation path
+        global _ENFORCEMENT_ACTIVE
+        _ENFORCEMENT_ACTIVE = True
         
         # Monkey-patch operations
         _monkey_patch_operations()
@@ -75,11 +81,71 @@ def activate_enforcement():
         logger.info("✅ Auto-enforcement activated")
         
     except Exception as e:
-        logger.warning(f"⚠️  Auto-enforcement failed to activate: {e}")
+        logger.warning("⚠️  Auto-enforcement failed to activate: %s", e)
 
 
-# Global enforcement pipeline instance
+# Global enforcement pipeline instance, built lazily once activated
+_ENFORCEMENT_ACTIVE = False
 _ENFORCEMENT_PIPELINE = None
+_PIPELINE_LOCK = threading.Lock()
+
+
+def _load_core_module(name: str):
+    """
+    Load core.<name> from BASE_PATH without touching sys.path.
+    
+    Reuses the module if it has already been imported.
+    """
+    full_name = f"core.{name}"
+    module = sys.modules.get(full_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            full_name, BASE_PATH / "core" / f"{name}.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[full_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[full_name]
+            raise
+    return module
+
+
+def _load_unified_enforcement():
+    """
+    Load core.unified_enforcement and the core modules it imports.
+    
+    Its `from core.x import ...` lines find those modules in sys.modules,
+    so BASE_PATH does not have to be on sys.path either.
+    """
+    _load_core_module("openai_helper")
+    try:
+        _load_core_module("system_integration")
+    except Exception:
+        pass  # Optional: unified_enforcement runs without SystemBus
+    return _load_core_module("unified_enforcement")
+
+
+def _get_pipeline():
+    """
+    Return the enforcement pipeline, constructing it on first use.
+    
+    Returns None if enforcement is not active or the pipeline fails to build.
+    """
+    global _ENFORCEMENT_ACTIVE, _ENFORCEMENT_PIPELINE
+    if _ENFORCEMENT_PIPELINE is not None or not _ENFORCEMENT_ACTIVE:
+        return _ENFORCEMENT_PIPELINE
+    
+    with _PIPELINE_LOCK:
+        if _ENFORCEMENT_PIPELINE is None and _ENFORCEMENT_ACTIVE:
+            try:
+                module = _load_unified_enforcement()
+                _ENFORCEMENT_PIPELINE = module.UnifiedEnforcementPipeline(BASE_PATH)
+            except Exception as e:
+                _ENFORCEMENT_ACTIVE = False
+                logger.warning("⚠️  Enforcement pipeline failed to initialize: %s", e)
+    return _ENFORCEMENT_PIPELINE
 
 
 def _monkey_patch_operations():
@@ -95,6 +161,19 @@ def _monkey_patch_operations():
     pass
 
 
+# Operation types that never touch paid tools; allowed without consulting
+# (or building) the pipeline
+_FAST_ALLOW = frozenset({'local_file', 'local_cache', 'noop'})
+
+# Shared result for fast-path operations -- callers must not mutate it
+_ALLOW_RESULT = {
+    'allowed': True,
+    'reason': 'Fast path: local operation',
+    'alternative': None,
+    'metadata': {}
+}
+
+
 def enforce_before_operation(operation_type: str, **kwargs):
     """
     Enforce rules before an operation executes.
@@ -106,7 +185,11 @@ def enforce_before_operation(operation_type: str, **kwargs):
     Returns:
         dict: Enforcement result with 'allowed', 'reason', 'alternative'
     """
-    if _ENFORCEMENT_PIPELINE is None:
+    if operation_type in _FAST_ALLOW:
+        return _ALLOW_RESULT
+    
+    pipeline = _get_pipeline()
+    if pipeline is None:
         # Enforcement not active, allow operation
         return {'allowed': True, 'reason': 'Enforcement not initialized'}
     
@@ -117,7 +200,7 @@ def enforce_before_operation(operation_type: str, **kwargs):
     }
     
     # Run through enforcement pipeline
-    result = _ENFORCEMENT_PIPELINE.enforce(action)
+    result = pipeline.enforce(action)
     
     # Return decision
     return {
@@ -130,7 +213,7 @@ def enforce_before_operation(operation_type: str, **kwargs):
 
 def get_enforcement_stats():
     """Get enforcement statistics."""
-    if _ENFORCEMENT_PIPELINE is None:
+    if not _ENFORCEMENT_ACTIVE:
         return {'status': 'not_initialized'}
     
     # TODO: Implement stats collection
@@ -147,6 +230,6 @@ if __name__ == '__main__':
     print("Installing Manus Auto-Enforcer...")
     if install_auto_enforcer():
         print("✅ Installation successful!")
-        print("The enforcement system will now activate automatically on every Python start.")
+        print("The enforcement system will now activate automatically on the first import of a Manus module.")
     else:
         print("❌ Installation failed. Check permissions.")
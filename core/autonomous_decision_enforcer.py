@@ -1,4 +1,3 @@
-import logging
 """
 Autonomous Decision Enforcement System
 
@@ -11,7 +10,152 @@ Priority: CRITICAL
 """
 
 import re
-from typing import Tuple, List
+from bisect import bisect_right
+from typing import Tuple, List, Optional, Iterable, Sequence
+
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+
+# RE2's shorthand classes are ASCII-only; these spell out what the stdlib
+# matches for them in a str pattern. "\s" is every str.isspace() character,
+# "\d" every Unicode decimal digit, "\w" letters, digits and underscore
+# (kept out of case folding, which would let in e.g. U+0345). Code points
+# only one engine's Unicode version has assigned may still differ.
+_UNICODE_SPACE = (
+    r"\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\x{1680}\x{2000}-\x{200a}"
+    r"\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}"
+)
+_RE2_CLASSES = {
+    r"\s": f"[{_UNICODE_SPACE}]",
+    r"\S": f"[^{_UNICODE_SPACE}]",
+    r"\d": r"\p{Nd}",
+    r"\D": r"\P{Nd}",
+    r"\w": r"(?-i:[\p{L}\p{N}_])",
+    r"\W": r"(?-i:[^\p{L}\p{N}_])",
+}
+
+# An escape, or a whole character class (which may open with "]" or "^]")
+_RE2_TOKEN_RE = re.compile(r"\\.|\[\^?\]?(?:\\.|[^\]\\])*\]")
+_RE2_CLASS_ESCAPE_RE = re.compile(r"\\[sSdDwWbB]")
+
+
+def _re2_pattern(pattern: str) -> Optional[str]:
+    """
+    pattern rewritten to match in RE2 what it matches in the stdlib re
+    
+    None if that cannot be done: shorthand classes inside a character class,
+    or a Unicode word boundary ("\\b", "\\B"), which RE2 has no way to spell.
+    """
+    unsupported = False
+    
+    def translate(match):
+        nonlocal unsupported
+        token = match.group()
+        if token.startswith("["):
+            unsupported = unsupported or bool(_RE2_CLASS_ESCAPE_RE.search(token))
+            return token
+        if token in (r"\b", r"\B"):
+            unsupported = True
+        return _RE2_CLASSES.get(token, token)
+    
+    translated = _RE2_TOKEN_RE.sub(translate, pattern)
+    return None if unsupported else translated
+
+
+def _compile(pattern: str):
+    """
+    Compile a pattern case-insensitively.
+    
+    Uses RE2's linear-time engine when installed, so patterns with several
+    unbounded wildcards (e.g. ".*or.*") cannot backtrack catastrophically
+    on long messages. Falls back to the stdlib re module otherwise, or if
+    the pattern cannot be carried over to RE2 (see _re2_pattern) or RE2
+    rejects it.
+    
+    Both engines must agree on what matches, so "\\s", "\\d" and "\\w"
+    (and their negations) are widened to the stdlib's Unicode classes for
+    RE2; case-insensitive matching is Unicode simple case folding in both
+    engines, so it needs no adjustment.
+    """
+    if RE2_AVAILABLE:
+        re2_pattern = _re2_pattern(pattern)
+        if re2_pattern is not None:
+            try:
+                return re2.compile("(?i)" + re2_pattern)
+            except re2.error:
+                pass
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _compile_scanner(patterns: List[str]):
+    """Compile patterns into one case-insensitive alternation (see _compile)"""
+    return _compile("|".join(f"(?:{p})" for p in patterns))
+
+
+# Shared results for the non-violation outcomes. Immutable (empty tuple for
+# the violations), so the clean path returns them without allocating.
+_EXCEPTION_RESULT: Tuple[bool, str, Sequence[str]] = (False, "Exception: Legitimate question", ())
+_OK_RESULT: Tuple[bool, str, Sequence[str]] = (False, "OK: Autonomous decision or legitimate question", ())
+
+
+_DIVIDER = "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+
+# Correction shown to the agent; {violations_block} holds one bullet per violation
+_CORRECTION_TEMPLATE = (
+    "\n"
+    f"{_DIVIDER}\n"
+    "🚫 AUTONOMOUS DECISION ENFORCEMENT - VIOLATION DETECTED\n"
+    f"{_DIVIDER}\n\n"
+    "**CRITICAL FAILURE:** You are asking the user to choose instead of deciding autonomously.\n\n"
+    "**Violations Found:**\n"
+    "{violations_block}"
+    "\n"
+    "**MANDATORY ACTION:**\n"
+    "1. STOP asking user to choose\n"
+    "2. ANALYZE all options yourself\n"
+    "3. CHOOSE the best option\n"
+    "4. EXPLAIN your decision\n"
+    "5. PROCEED with implementation\n\n"
+    "**Remember:** \"Don't ask, decide. Then explain why.\"\n\n"
+    f"{_DIVIDER}\n"
+)
+
+
+class _CompiledRule:
+    """
+    A violation pattern compiled once, with a matcher reporting its first hit.
+    
+    Every VIOLATION_PATTERNS entry uses regex syntax (at least "\\s+"), so
+    rules are always compiled regexes (with RE2 when installed, like the
+    scanners; see _compile); there is no literal fast path to dispatch to.
+    Rules are applied to lowercased text.
+    """
+    
+    __slots__ = ('fn', 'src')
+    
+    def __init__(self, pattern: str):
+        self.src = pattern
+        compiled = _compile(pattern)
+        groups = compiled.groups
+        
+        # search() stops at the first hit; report it the way findall()[0]
+        # did (whole match, the only group, or a tuple of all groups)
+        def first_match(text: str) -> Optional[str]:
+            match = compiled.search(text)
+            if match is None:
+                return None
+            if groups == 0:
+                return match.group(0)
+            if groups == 1:
+                return match.group(1) or ''
+            return match.groups('')
+        
+        self.fn = first_match
+
 
 class AutonomousDecisionEnforcer:
     """
@@ -42,11 +186,19 @@ class AutonomousDecisionEnforcer:
         r"(unclear|ambiguous|contradictory).*intent",
     ]
     
+    # Each pattern list compiled once into a single alternation, so the common
+    # no-violation path is one regex scan per list instead of one per pattern
+    _EXCEPTION_RE = _compile_scanner(EXCEPTION_PATTERNS)
+    _VIOLATION_RE = _compile_scanner(VIOLATION_PATTERNS)
+    
+    # Individual rules, only used to itemise violations once one is found
+    _VIOLATION_RULES = [_CompiledRule(p) for p in VIOLATION_PATTERNS]
+    
     def __init__(self):
         self.violation_count = 0
         self.decision_count = 0
     
-    def check_message(self, message: str) -> Tuple[bool, str, List[str]]:
+    def check_message(self, message: str) -> Tuple[bool, str, Sequence[str]]:
         """
         Check if message violates autonomous decision-making principle.
         
@@ -56,19 +208,20 @@ class AutonomousDecisionEnforcer:
         Returns:
             Tuple of (is_violation, reason, violations_found)
         """
-        message_lower = message.lower()
-        
-        # Check for exceptions first
-        for pattern in self.EXCEPTION_PATTERNS:
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                return (False, "Exception: Legitimate question", [])
+        # Scanners are case-insensitive, so the common (clean) path never
+        # copies the message
+        if self._EXCEPTION_RE.search(message):
+            return _EXCEPTION_RESULT
         
         # Check for violations
         violations = []
-        for pattern in self.VIOLATION_PATTERNS:
-            matches = re.findall(pattern, message_lower, re.IGNORECASE)
-            if matches:
-                violations.append(f"Pattern: {pattern} | Match: {matches[0]}")
+        if self._VIOLATION_RE.search(message):
+            # Fold once, only when a violation needs itemising
+            message_lower = message.lower()
+            for rule in self._VIOLATION_RULES:
+                match = rule.fn(message_lower)
+                if match is not None:
+                    violations.append(f"Pattern: {rule.src} | Match: {match}")
         
         if violations:
             self.violation_count += 1
@@ -77,9 +230,51 @@ class AutonomousDecisionEnforcer:
         
         # No violation - good autonomous decision
         self.decision_count += 1
-        return (False, "OK: Autonomous decision or legitimate question", [])
+        return _OK_RESULT
+    
+    # Joins messages for batch scans. No pattern can match across it: "."
+    # stops at the newlines and "\s" cannot consume the NUL between them.
+    BATCH_SEPARATOR = "\n\x00\n"
+    
+    def check_messages(self, messages: Iterable[str]) -> List[Tuple[bool, str, Sequence[str]]]:
+        """
+        Check many messages at once.
+        
+        Scans all messages joined together with one pass per pattern list,
+        then itemises violations only for the messages that were hit.
+        
+        Args:
+            messages: The messages to check
+            
+        Returns:
+            List of check_message() results, aligned with the input
+        """
+        messages = list(messages)
+        
+        starts = []
+        pos = 0
+        for message in messages:
+            starts.append(pos)
+            pos += len(message) + len(self.BATCH_SEPARATOR)
+        combined = self.BATCH_SEPARATOR.join(messages)
+        
+        excepted = {bisect_right(starts, m.start()) - 1
+                    for m in self._EXCEPTION_RE.finditer(combined)}
+        flagged = {bisect_right(starts, m.start()) - 1
+                   for m in self._VIOLATION_RE.finditer(combined)}
+        
+        results = []
+        for index, message in enumerate(messages):
+            if index in excepted:
+                results.append(_EXCEPTION_RESULT)
+            elif index in flagged:
+                results.append(self.check_message(message))
+            else:
+                self.decision_count += 1
+                results.append(_OK_RESULT)
+        return results
     
-    def get_correction_message(self, violations: List[str]) -> str:
+    def get_correction_message(self, violations: Sequence[str]) -> str:
         """
         Generate correction message when violation is detected.
         
@@ -89,24 +284,8 @@ class AutonomousDecisionEnforcer:
         Returns:
             Correction message
         """
-        msg = "\n"
-        msg += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        msg += "🚫 AUTONOMOUS DECISION ENFORCEMENT - VIOLATION DETECTED\n"
-        msg += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-        msg += "**CRITICAL FAILURE:** You are asking the user to choose instead of deciding autonomously.\n\n"
-        msg += "**Violations Found:**\n"
-        for v in violations:
-            msg += f"  • {v}\n"
-        msg += "\n"
-        msg += "**MANDATORY ACTION:**\n"
-        msg += "1. STOP asking user to choose\n"
-        msg += "2. ANALYZE all options yourself\n"
-        msg += "3. CHOOSE the best option\n"
-        msg += "4. EXPLAIN your decision\n"
-        msg += "5. PROCEED with implementation\n\n"
-        msg += "**Remember:** \"Don't ask, decide. Then explain why.\"\n\n"
-        msg += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        return msg
+        violations_block = "".join(f"  • {v}\n" for v in violations)
+        return _CORRECTION_TEMPLATE.format(violations_block=violations_block)
     
     def get_stats(self) -> dict:
         """Get enforcement statistics"""
@@ -123,6 +302,11 @@ class AutonomousDecisionEnforcer:
         }
 
 
+# Shared instance for check_before_sending, so its violation/decision
+# counters accumulate across calls instead of resetting every time
+_ENFORCER_SINGLETON = AutonomousDecisionEnforcer()
+
+
 def check_before_sending(message: str) -> Tuple[bool, str]:
     """
     Convenience function to check message before sending to user.
@@ -133,7 +317,7 @@ def check_before_sending(message: str) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_ok_to_send, feedback_message)
     """
-    enforcer = AutonomousDecisionEnforcer()
+    enforcer = _ENFORCER_SINGLETON
     is_violation, reason, violations = enforcer.check_message(message)
     
     if is_violation:
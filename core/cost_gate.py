@@ -4,14 +4,112 @@ Cost Validation Gate - Refactored
 Loads all rules from YAML configuration, removing hardcoded values.
 """
 
-import json
-from datetime import datetime
+import atexit
+import fcntl
+import functools
+import time
+import weakref
 from pathlib import Path
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Optional, FrozenSet, Iterator
+
+try:
+    import orjson
+
+    def _dumps_line(obj) -> bytes:
+        """Compact JSON encoding, newline-terminated"""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    def _dumps_line(obj) -> bytes:
+        """Compact JSON encoding, newline-terminated"""
+        import json
+        return (json.dumps(obj, separators=(',', ':')) + "\n").encode()
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+@functools.lru_cache(maxsize=8)
+def _keyword_matcher(keywords: FrozenSet[str]):
+    """Build a predicate telling whether text contains any of keywords.
+
+    Uses a single Aho-Corasick pass when pyahocorasick is installed,
+    otherwise falls back to one substring check per keyword.
+    """
+    if not keywords:
+        return lambda text: False
+
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+
+    return lambda text: any(keyword in text for keyword in keywords)
+
+
+@functools.lru_cache(maxsize=4096)
+def _can_openai_handle(
+    action_type: str,
+    task_description: str,
+    manus_only: FrozenSet[str],
+    openai_first: FrozenSet[str],
+    keywords: FrozenSet[str]
+) -> bool:
+    """Routing decision behind CostGate.can_openai_handle.
+
+    Cached on the task and the gate's routing sets, so recurring tasks skip
+    the keyword scan and a gate built from different rules never shares
+    another gate's results.
+    """
+    # If the action is explicitly Manus-only, OpenAI cannot handle it.
+    if action_type in manus_only:
+        return False
+
+    # If the action is a candidate for OpenAI, it can handle it.
+    if action_type in openai_first:
+        return True
+
+    # Check for keywords that indicate Manus-only browser tasks
+    task_lower = task_description.lower()
+    if _keyword_matcher(keywords)(task_lower):
+        return False
+
+    # Default to true if not explicitly defined, allows for flexibility
+    return True
+
+
+# Gates whose counts are added to the summary at exit; held weakly so that
+# the exit hook does not keep every gate ever created alive
+_live_gates = weakref.WeakSet()
+
+
+def _flush_live_gates():
+    """Add the counts of every CostGate still alive to its summary."""
+    for gate in list(_live_gates):
+        gate._flush_summary()
+
+
+atexit.register(_flush_live_gates)
+
 
 class CostGate:
     """Validates actions based on dynamically loaded cost rules."""
 
+    # Keywords that mark a task as Manus-only browser work, used when the
+    # config does not provide its own "manus_only_keywords"
+    MANUS_ONLY_KEYWORDS = frozenset({
+        'browser', 'click', 'navigate', 'screenshot',
+        'download file', 'upload file', 'interact with page',
+        'fill form', 'submit button'
+    })
+
+    # Expensive Manus tools that Rule 1 redirects to OpenAI
+    MANUS_TOOLS = frozenset({"manus_browser", "manus_search", "manus_research"})
+
     def __init__(self, rules: Dict[str, Any], base_path: Path):
         """Initialize the CostGate with configuration.
 
@@ -21,35 +119,32 @@ class CostGate:
         """
         self.config = rules
         self.base_path = base_path
-        self.log_path = self.base_path / "metrics" / "cost_gate_log.json"
-        self.blocks = []
-        self.approvals = []
+        self.log_path = self.base_path / "metrics" / "cost_gate_log.jsonl"
+        self.summary_path = self.base_path / "metrics" / "cost_gate_summary.json"
+        self.counts = {"blocks": 0, "approvals": 0}
+        _live_gates.add(self)
+
+        # Routing and keyword sets are fixed for the lifetime of the gate, so
+        # resolve them once instead of on every check
+        routing_rules = rules.get("routing", {})
+        self._routing_manus_only = frozenset(routing_rules.get("manus_only", ()))
+        self._routing_openai_first = frozenset(routing_rules.get("openai_first", ()))
+
+        manus_only_keywords = rules.get("manus_only_keywords")
+        if manus_only_keywords is None:
+            self._manus_kw_set = self.MANUS_ONLY_KEYWORDS
+        else:
+            self._manus_kw_set = frozenset(manus_only_keywords)
+
+        # Rule handlers by proposed tool; tools not listed only get Rule 2
+        self._handlers = dict.fromkeys(self.MANUS_TOOLS, self._check_cheaper_route)
 
     def can_openai_handle(self, action_type: str, task_description: str) -> bool:
         """Check if OpenAI can handle this task based on routing rules."""
-        routing_rules = self.config.get("routing", {})
-        
-        # If the action is explicitly Manus-only, OpenAI cannot handle it.
-        if action_type in routing_rules.get("manus_only", []):
-            return False
-
-        # If the action is a candidate for OpenAI, it can handle it.
-        if action_type in routing_rules.get("openai_first", []):
-            return True
-
-        # Check for keywords that indicate Manus-only browser tasks
-        manus_only_keywords = self.config.get("manus_only_keywords", [
-            'browser', 'click', 'navigate', 'screenshot',
-            'download file', 'upload file', 'interact with page',
-            'fill form', 'submit button'
-        ])
-        
-        task_lower = task_description.lower()
-        if any(keyword in task_lower for keyword in manus_only_keywords):
-            return False
-        
-        # Default to true if not explicitly defined, allows for flexibility
-        return True
+        return _can_openai_handle(
+            action_type, task_description,
+            self._routing_manus_only, self._routing_openai_first, self._manus_kw_set
+        )
 
     def validate_action(
         self,
@@ -63,25 +158,30 @@ class CostGate:
         Returns:
             (allowed, recommended_tool, final_cost, reason)
         """
-        cost_multipliers = self.config.get("cost_multiplier", {})
-        thresholds = self.config.get("thresholds", {})
-        blocking_rules = self.config.get("blocking", {})
+        proposed_cost = cost_estimate * self.config.get("cost_multiplier", {}).get(proposed_tool, 1.0)
 
-        proposed_cost = cost_estimate * cost_multipliers.get(proposed_tool, 1.0)
+        # Only the expensive Manus tools go through Rule 1; every other tool
+        # skips straight to the threshold check without a keyword scan
+        handler = self._handlers.get(proposed_tool, self._check_threshold)
+        return handler(action_type, task_description, proposed_tool, proposed_cost)
 
-        # Rule 1: If OpenAI can do it, block expensive Manus tools
+    def _check_cheaper_route(self, action_type, task_description, proposed_tool, proposed_cost):
+        """Rule 1: If OpenAI can do it, block expensive Manus tools."""
+        blocking_rules = self.config.get("blocking", {})
         if blocking_rules.get("block_if_cheaper_exists", True) and self.can_openai_handle(action_type, task_description):
-            if proposed_tool in ["manus_browser", "manus_search", "manus_research"]:
-                openai_cost = cost_multipliers.get("openai", 0.0001)
-                if proposed_cost > openai_cost:
-                    savings = proposed_cost - openai_cost
-                    reason = f"BLOCKED: OpenAI can handle this for ~{openai_cost:.4f} credits (vs {proposed_cost} for {proposed_tool}). Savings: {savings:.2f} credits"
-                    self.log_block(action_type, task_description, proposed_tool, "openai", reason)
-                    return (False, "openai", openai_cost, reason)
-
-        # Rule 2: Check for high-cost actions that require justification
-        critical_threshold = thresholds.get("critical", 100)
-        if blocking_rules.get("require_justification_above") and proposed_cost > critical_threshold:
+            openai_cost = self.config.get("cost_multiplier", {}).get("openai", 0.0001)
+            if proposed_cost > openai_cost:
+                savings = proposed_cost - openai_cost
+                reason = f"BLOCKED: OpenAI can handle this for ~{openai_cost:.4f} credits (vs {proposed_cost} for {proposed_tool}). Savings: {savings:.2f} credits"
+                self.log_block(action_type, task_description, proposed_tool, "openai", reason)
+                return (False, "openai", openai_cost, reason)
+
+        return self._check_threshold(action_type, task_description, proposed_tool, proposed_cost)
+
+    def _check_threshold(self, action_type, task_description, proposed_tool, proposed_cost):
+        """Rule 2: Check for high-cost actions that require justification."""
+        critical_threshold = self.config.get("thresholds", {}).get("critical", 100)
+        if self.config.get("blocking", {}).get("require_justification_above") and proposed_cost > critical_threshold:
             reason = f"BLOCKED: Action cost ({proposed_cost}) exceeds critical threshold ({critical_threshold}). Requires explicit user approval."
             self.log_block(action_type, task_description, proposed_tool, proposed_tool, reason)
             return (False, proposed_tool, proposed_cost, reason)
@@ -110,22 +210,75 @@ class CostGate:
 
     def _log_entry(self, log_type: str, data: Dict[str, Any]):
         """Log an entry for a blocked or approved action."""
-        entry = {"timestamp": datetime.now().isoformat(), **data}
-        getattr(self, log_type).append(entry)
-        self._save_log()
+        entry = {"timestamp": time.time_ns(), "log_type": log_type, **data}
+        self.counts[log_type] += 1
+        self._save_log(entry)
 
-    def _save_log(self):
-        """Save the current logs to a file."""
+    def _save_log(self, entry: Dict[str, Any]):
+        """Append a single entry to the JSONL log."""
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
-        log_data = {
-            "blocks": self.blocks,
-            "approvals": self.approvals,
-            "total_blocks": len(self.blocks),
-            "total_approvals": len(self.approvals),
-            "block_rate": len(self.blocks) / max(len(self.blocks) + len(self.approvals), 1)
+        with self.log_path.open("ab") as f:
+            f.write(_dumps_line(entry))
+
+    def _summary(self, blocks: int, approvals: int) -> Dict[str, Any]:
+        """Build the totals/block-rate summary for the given counts."""
+        return {
+            "total_blocks": blocks,
+            "total_approvals": approvals,
+            "block_rate": blocks / max(blocks + approvals, 1)
         }
-        with self.log_path.open("w") as f:
-            json.dump(log_data, f, indent=2)
+
+    def _flush_summary(self):
+        """Add the counts since the last flush to the summary file.
+
+        Runs at interpreter shutdown (or when the gate is collected). The
+        file is locked while it is read and rewritten, so gates in other
+        processes exiting at the same time add to the totals instead of
+        replacing them.
+        """
+        import json
+        if not any(self.counts.values()):
+            return
+        self.summary_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.summary_path.open("a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                previous = json.load(f)
+            except ValueError:
+                previous = {}
+            blocks = previous.get("total_blocks", 0) + self.counts["blocks"]
+            approvals = previous.get("total_approvals", 0) + self.counts["approvals"]
+            f.seek(0)
+            f.truncate()
+            json.dump(self._summary(blocks, approvals), f, indent=2)
+        self.counts = {"blocks": 0, "approvals": 0}
+
+    def __del__(self):
+        # The exit hook holds gates weakly, so a gate collected before exit
+        # adds its counts here
+        if getattr(self, "counts", None):
+            self._flush_summary()
+
+    def _iter_log(self) -> Iterator[Dict[str, Any]]:
+        """Yield logged entries one at a time."""
+        import json
+        try:
+            with self.log_path.open() as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Aggregate block/approval totals across the whole log."""
+        counts = {"blocks": 0, "approvals": 0}
+        for entry in self._iter_log():
+            log_type = entry.get("log_type")
+            if log_type in counts:
+                counts[log_type] += 1
+        return self._summary(counts["blocks"], counts["approvals"])
 
 
 
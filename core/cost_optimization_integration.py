@@ -17,47 +17,209 @@ Usage:
 """
 
 import os
+import re
 import sys
+import json
+import math
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add core directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from prompt_optimizer import PromptOptimizer
-from response_controller import ResponseController
+_TOKEN_RE = re.compile(r'\w+')
+
+# Tool offered to the model when history messages were stubbed, so it can
+# ask for a stubbed message back instead of guessing at its content
+STUB_RETRIEVAL_TOOL = {
+    'type': 'function',
+    'function': {
+        'name': 'retrieve_stubbed_content',
+        'description': 'Return the full text of an earlier message that was '
+                       'replaced by a [stubbed:<id>] placeholder.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'stub_id': {
+                    'type': 'string',
+                    'description': 'The <id> part of the placeholder, e.g. "3:9f2c4e1a0b7d6e5f"'
+                }
+            },
+            'required': ['stub_id']
+        }
+    }
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercased word tokens for BM25 scoring"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _SimpleBM25:
+    """
+    Minimal Okapi BM25, used when rank_bm25 is not installed
+    
+    Same interface as rank_bm25.BM25Okapi: build from a tokenized corpus,
+    then get_scores(query_tokens) returns one score per document.
+    """
+    
+    def __init__(self, corpus: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_freqs = []
+        self.doc_len = []
+        document_count = {}
+        for document in corpus:
+            frequencies = {}
+            for token in document:
+                frequencies[token] = frequencies.get(token, 0) + 1
+            for token in frequencies:
+                document_count[token] = document_count.get(token, 0) + 1
+            self.doc_freqs.append(frequencies)
+            self.doc_len.append(len(document))
+        n = len(corpus)
+        self.avgdl = (sum(self.doc_len) / n) if n else 0.0
+        self.idf = {
+            token: math.log(1 + (n - count + 0.5) / (count + 0.5))
+            for token, count in document_count.items()
+        }
+    
+    def get_scores(self, query: List[str]) -> List[float]:
+        scores = []
+        avgdl = self.avgdl or 1.0
+        for frequencies, length in zip(self.doc_freqs, self.doc_len):
+            norm = self.k1 * (1 - self.b + self.b * length / avgdl)
+            score = 0.0
+            for token in query:
+                tf = frequencies.get(token)
+                if tf:
+                    score += self.idf[token] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
 
 
 class CostOptimizationIntegration:
     """Integration layer for cost optimization modules"""
     
-    def __init__(self, enable_optimization: bool = True):
+    # Optimized message lists kept for repeated prompts
+    CACHE_MAXSIZE = 1024
+    
+    # History ranking: conversations longer than this many messages have
+    # their least relevant turns stubbed, keeping this share of the rest
+    HISTORY_RANKING_THRESHOLD = 6
+    HISTORY_KEEP_RATIO = 0.5
+    
+    # Stubbed message contents kept for retrieve_stubbed_content()
+    STUB_STORE_MAXSIZE = 4096
+    
+    def __init__(self, enable_optimization: bool = True, min_compression_chars: Optional[int] = None,
+                 rank_history: bool = False):
         """
         Initialize integration layer
         
         Args:
             enable_optimization: Whether to enable optimization (can be disabled for testing)
+            min_compression_chars: Prompts shorter than this skip compression
+                (default: COST_OPT_MIN_CHARS env var, else 200 chars ~ 50 tokens)
+            rank_history: Whether to stub low-relevance turns of long conversations
+                (opt-in: the caller must answer retrieve_stubbed_content tool calls)
         """
         self.enable_optimization = enable_optimization
+        self.rank_history = rank_history
+        
+        # Below this size compression costs more than the tokens it saves
+        if min_compression_chars is None:
+            min_compression_chars = int(os.environ.get('COST_OPT_MIN_CHARS', '200'))
+        self.min_compression_chars = min_compression_chars
+        
+        # Modules are imported and built on first use (see properties below)
+        self._prompt_optimizer = None
+        self._response_controller = None
+        
+        # (max_tokens by request type, fallback), read once from the controller
+        self._max_tokens_table = None
+        
+        # BM25 implementation, resolved on the first long conversation
+        self._bm25 = None
         
-        # Initialize modules
-        self.prompt_optimizer = PromptOptimizer()
-        self.response_controller = ResponseController()
+        # stub id -> original message content, oldest first
+        self._stubbed: "OrderedDict[str, str]" = OrderedDict()
+        
+        # (request_type, cache_boundary, messages digest) -> optimized messages, LRU order
+        self._opt_cache: "OrderedDict[Tuple[str, int, bytes], list]" = OrderedDict()
+        
+        # Guards stats and the cache when calls come from several threads
+        self._lock = threading.Lock()
         
         # Stats tracking
         self.stats = {
             'total_calls': 0,
             'optimized_calls': 0,
+            'cache_hits': 0,
+            'skipped_calls': 0,
+            'stubbed_messages': 0,
             'total_tokens_saved': 0
         }
     
-    def optimize_api_call(self, api_params: Dict[str, Any], request_type: str = 'default') -> Dict[str, Any]:
+    @property
+    def prompt_optimizer(self):
+        """PromptOptimizer, imported and initialized on first access"""
+        if self._prompt_optimizer is None:
+            from prompt_optimizer import PromptOptimizer
+            self._prompt_optimizer = PromptOptimizer()
+        return self._prompt_optimizer
+    
+    @property
+    def response_controller(self):
+        """ResponseController, imported and initialized on first access"""
+        if self._response_controller is None:
+            from response_controller import ResponseController
+            self._response_controller = ResponseController()
+        return self._response_controller
+    
+    @property
+    def bm25(self):
+        """BM25 class: rank_bm25.BM25Okapi if installed, else _SimpleBM25"""
+        if self._bm25 is None:
+            try:
+                from rank_bm25 import BM25Okapi
+                self._bm25 = BM25Okapi
+            except ImportError:
+                self._bm25 = _SimpleBM25
+        return self._bm25
+    
+    def optimize_api_call(self, api_params: Dict[str, Any], request_type: str = 'default',
+                          cache_boundary: Optional[int] = None) -> Dict[str, Any]:
         """
         Optimize API call parameters before sending
         
+        Messages before cache_boundary are sent byte-for-byte unchanged so
+        provider-side prompt caching can reuse them across calls; only the
+        messages after it are compressed. Put all invariant content (system
+        instructions, tool schemas, few-shot examples) before the boundary.
+        
+        With rank_history enabled, history turns of long conversations that
+        score low against the last user message are replaced by
+        [stubbed:<id>] placeholders and the retrieve_stubbed_content tool is
+        added (see _rank_history). The caller must then answer that tool's
+        calls, e.g. with retrieve_stubbed_content(). Requests using the
+        legacy 'functions' parameter are never ranked, since 'tools' cannot
+        be added to them.
+        
+        api_params is not modified. The returned dict and its messages list
+        are new, but unchanged messages are shared with the input rather
+        than copied, so replace a message instead of editing it in place.
+        
         Args:
             api_params: Original API parameters
             request_type: Type of request ('summary', 'analysis', etc.)
+            cache_boundary: Number of leading messages to leave untouched
+                (default: 1 if the first message is a system prompt, else 0)
             
         Returns:
             Optimized API parameters
@@ -65,21 +227,229 @@ class CostOptimizationIntegration:
         if not self.enable_optimization:
             return api_params
         
-        self.stats['total_calls'] += 1
+        with self._lock:
+            self.stats['total_calls'] += 1
         
-        # Step 1: Optimize prompt
-        optimized_params = self.prompt_optimizer.optimize_prompt_data(api_params)
+        messages = api_params.get('messages')
+        if cache_boundary is None:
+            cache_boundary = 1 if messages and messages[0].get('role') == 'system' else 0
         
-        # Step 2: Enforce max_tokens
-        optimized_params = self.response_controller.enforce_max_tokens(
-            optimized_params,
-            request_type=request_type
-        )
+        # Step 0: Stub irrelevant history in long conversations
+        original_params = api_params
+        if (self.rank_history and messages and len(messages) > self.HISTORY_RANKING_THRESHOLD
+                and 'functions' not in api_params):
+            api_params = self._rank_history(api_params, cache_boundary)
+        
+        # Step 1: Optimize prompt, unless it is too small to be worth it
+        compress = self._prompt_chars(api_params) >= self.min_compression_chars
+        if not compress:
+            with self._lock:
+                self.stats['skipped_calls'] += 1
+            optimized_params = dict(api_params)
+        else:
+            optimized_params = self._optimize_prompt_cached(api_params, request_type, cache_boundary)
+        
+        # Savings are estimated from characters (4 per token): running the
+        # tokenizer over every prompt would cost more than it measures
+        if compress or api_params is not original_params:
+            saved = (self._prompt_chars(original_params) - self._prompt_chars(optimized_params)) // 4
+            with self._lock:
+                self.stats['total_tokens_saved'] += saved
+        
+        # Step 2: Enforce max_tokens (optimized_params is already our own copy)
+        if self._max_tokens_table is None:
+            self._max_tokens_table = self.response_controller.get_max_tokens_table()
+        limits, default_limit = self._max_tokens_table
+        max_tokens = limits.get(request_type, default_limit)
+        if 'max_tokens' not in optimized_params or optimized_params['max_tokens'] > max_tokens:
+            optimized_params['max_tokens'] = max_tokens
+        
+        with self._lock:
+            self.stats['optimized_calls'] += 1
+        
+        return optimized_params
+    
+    def _optimize_prompt_cached(self, api_params: Dict[str, Any], request_type: str,
+                                cache_boundary: int) -> Dict[str, Any]:
+        """
+        Optimize the prompt, reusing the result for repeated messages
+        
+        Args:
+            api_params: Original API parameters
+            request_type: Type of request
+            cache_boundary: Number of leading messages to leave untouched
+            
+        Returns:
+            API parameters with the prompt optimized
+        """
+        key = self._cache_key(api_params, request_type, cache_boundary)
+        if key is None:
+            return self._optimize_prompt(api_params, cache_boundary)
         
-        self.stats['optimized_calls'] += 1
+        with self._lock:
+            cached = self._opt_cache.get(key)
+            if cached is not None:
+                self._opt_cache.move_to_end(key)
+                self.stats['cache_hits'] += 1
+        if cached is not None:
+            optimized_params = dict(api_params)
+            optimized_params['messages'] = list(cached)
+            return optimized_params
         
+        optimized_params = self._optimize_prompt(api_params, cache_boundary)
+        entry = list(optimized_params['messages'])
+        with self._lock:
+            self._opt_cache[key] = entry
+            if len(self._opt_cache) > self.CACHE_MAXSIZE:
+                self._opt_cache.popitem(last=False)
         return optimized_params
     
+    def _rank_history(self, api_params: Dict[str, Any], cache_boundary: int) -> Dict[str, Any]:
+        """
+        Stub the history messages least relevant to the last user message
+        
+        Messages are scored with BM25 against the last user message. System
+        messages, messages before cache_boundary, the last user message and
+        the last assistant message are never stubbed; of the rest, the top
+        HISTORY_KEEP_RATIO by score are kept. A stubbed message keeps its
+        other keys (role, tool_call_id, ...) and its content becomes
+        [stubbed:<id>], recoverable through retrieve_stubbed_content().
+        
+        Args:
+            api_params: Original API parameters
+            cache_boundary: Number of leading messages to leave untouched
+            
+        Returns:
+            API parameters with low-relevance messages stubbed (api_params
+            itself if nothing was stubbed)
+        """
+        messages = api_params['messages']
+        last_index = {}
+        for i, message in enumerate(messages):
+            last_index[message.get('role')] = i
+        if 'user' not in last_index:
+            return api_params
+        
+        protected = {last_index['user'], last_index.get('assistant')}
+        candidates = [
+            i for i, message in enumerate(messages)
+            if i >= cache_boundary and i not in protected
+            and message.get('role') != 'system' and isinstance(message.get('content'), str)
+        ]
+        keep = math.ceil(len(candidates) * self.HISTORY_KEEP_RATIO)
+        if len(candidates) <= keep:
+            return api_params
+        
+        query = _tokenize(messages[last_index['user']].get('content') or '')
+        scores = self.bm25([_tokenize(messages[i]['content']) for i in candidates]).get_scores(query)
+        
+        # Lowest scores first; on ties the older message goes first
+        ranked = sorted(zip(scores, candidates))
+        stubs = {}
+        for _, i in ranked[:len(candidates) - keep]:
+            content = messages[i]['content']
+            digest = hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+            stub_id = f'{i}:{digest}'
+            placeholder = f'[stubbed:{stub_id}]'
+            if len(placeholder) < len(content):
+                stubs[i] = (stub_id, placeholder)
+        if not stubs:
+            return api_params
+        
+        ranked_messages = list(messages)
+        with self._lock:
+            for i, (stub_id, placeholder) in stubs.items():
+                self._stubbed[stub_id] = messages[i]['content']
+                self._stubbed.move_to_end(stub_id)
+                ranked_messages[i] = {**messages[i], 'content': placeholder}
+            while len(self._stubbed) > self.STUB_STORE_MAXSIZE:
+                self._stubbed.popitem(last=False)
+            self.stats['stubbed_messages'] += len(stubs)
+        
+        ranked_params = dict(api_params)
+        ranked_params['messages'] = ranked_messages
+        tools = list(api_params.get('tools') or [])
+        if STUB_RETRIEVAL_TOOL not in tools:
+            ranked_params['tools'] = tools + [STUB_RETRIEVAL_TOOL]
+        return ranked_params
+    
+    def retrieve_stubbed_content(self, stub_id: str) -> Optional[str]:
+        """
+        Original content of a stubbed message
+        
+        Use this to answer a retrieve_stubbed_content tool call.
+        
+        Args:
+            stub_id: The id inside the [stubbed:<id>] placeholder
+            
+        Returns:
+            The message content, or None if it is unknown or was evicted
+        """
+        with self._lock:
+            return self._stubbed.get(stub_id)
+    
+    @staticmethod
+    def _prompt_chars(api_params: Dict[str, Any]) -> int:
+        """
+        Size of the prompt text in characters
+        
+        Args:
+            api_params: Original API parameters
+            
+        Returns:
+            Total length of the message contents (or of 'prompt')
+        """
+        messages = api_params.get('messages')
+        if messages is not None:
+            return sum(len(message.get('content') or '') for message in messages)
+        return len(api_params.get('prompt') or '')
+    
+    def _optimize_prompt(self, api_params: Dict[str, Any], cache_boundary: int) -> Dict[str, Any]:
+        """
+        Compress the prompt, leaving the cacheable message prefix untouched
+        
+        Args:
+            api_params: Original API parameters
+            cache_boundary: Number of leading messages to leave untouched
+            
+        Returns:
+            API parameters with the prompt optimized
+        """
+        messages = api_params.get('messages')
+        if not messages or cache_boundary <= 0:
+            return self.prompt_optimizer.optimize_prompt_data(api_params)
+        
+        static_prefix = messages[:cache_boundary]
+        optimized = self.prompt_optimizer.optimize_prompt_data(
+            {**api_params, 'messages': messages[cache_boundary:]}
+        )
+        optimized['messages'] = static_prefix + optimized['messages']
+        return optimized
+    
+    @staticmethod
+    def _cache_key(api_params: Dict[str, Any], request_type: str,
+                   cache_boundary: int = 0) -> Optional[Tuple[str, int, bytes]]:
+        """
+        Build the optimization cache key for a chat request
+        
+        Args:
+            api_params: Original API parameters
+            request_type: Type of request
+            cache_boundary: Number of leading messages left untouched
+            
+        Returns:
+            (request_type, cache_boundary, blake2b digest of the messages), or
+            None if the request has no messages or they are not JSON-serializable
+        """
+        messages = api_params.get('messages')
+        if messages is None:
+            return None
+        try:
+            encoded = json.dumps(messages, sort_keys=True).encode()
+        except (TypeError, ValueError):
+            return None
+        return (request_type, cache_boundary, hashlib.blake2b(encoded, digest_size=16).digest())
+    
     def process_api_response(self, response_data: Any, request_type: str = 'default') -> Any:
         """
         Process API response to control length
@@ -103,44 +473,44 @@ class CostOptimizationIntegration:
         Returns:
             Dict with stats
         """
-        return self.stats.copy()
+        with self._lock:
+            return self.stats.copy()
 
 
 # Global instance (singleton pattern)
-_global_optimizer = None
-
-
+@functools.lru_cache(maxsize=1)
 def get_optimizer() -> CostOptimizationIntegration:
     """
     Get global optimizer instance
     
+    Created on first call; get_optimizer.cache_clear() resets it.
+    
     Returns:
         Global CostOptimizationIntegration instance
     """
-    global _global_optimizer
-    
-    if _global_optimizer is None:
-        # Check environment variable to enable/disable
-        enable = os.environ.get('ENABLE_COST_OPTIMIZATION', 'true').lower() == 'true'
-        _global_optimizer = CostOptimizationIntegration(enable_optimization=enable)
-    
-    return _global_optimizer
+    # Check environment variables to enable/disable (history ranking is opt-in)
+    enable = os.environ.get('ENABLE_COST_OPTIMIZATION', 'true').lower() == 'true'
+    rank_history = os.environ.get('COST_OPT_RANK_HISTORY', 'false').lower() == 'true'
+    return CostOptimizationIntegration(enable_optimization=enable, rank_history=rank_history)
 
 
 # Convenience functions
-def optimize_api_call(api_params: Dict[str, Any], request_type: str = 'default') -> Dict[str, Any]:
+def optimize_api_call(api_params: Dict[str, Any], request_type: str = 'default',
+                      cache_boundary: Optional[int] = None) -> Dict[str, Any]:
     """
     Convenience function to optimize API call
     
     Args:
         api_params: Original API parameters
         request_type: Type of request
+        cache_boundary: Number of leading messages to leave untouched
         
     Returns:
         Optimized API parameters
     """
     optimizer = get_optimizer()
-    return optimizer.optimize_api_call(api_params, request_type=request_type)
+    return optimizer.optimize_api_call(api_params, request_type=request_type,
+                                       cache_boundary=cache_boundary)
 
 
 def process_api_response(response_data: Any, request_type: str = 'default') -> Any:
@@ -158,6 +528,20 @@ def process_api_response(response_data: Any, request_type: str = 'default') -> A
     return optimizer.process_api_response(response_data, request_type=request_type)
 
 
+def retrieve_stubbed_content(stub_id: str) -> Optional[str]:
+    """
+    Convenience function to recover a stubbed history message
+    
+    Args:
+        stub_id: The id inside the [stubbed:<id>] placeholder
+        
+    Returns:
+        The message content, or None if unknown
+    """
+    optimizer = get_optimizer()
+    return optimizer.retrieve_stubbed_content(stub_id)
+
+
 def get_optimization_stats() -> Dict[str, Any]:
     """
     Convenience function to get optimization stats
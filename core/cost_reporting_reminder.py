@@ -7,12 +7,25 @@ Since we can't intercept Manus tools automatically, we use cognitive enforcement
 
 import os
 from pathlib import Path
+from types import MappingProxyType
 
-def create_reminder_file():
-    """Create a reminder file that forces cost reporting"""
-    reminder_path = Path("/home/ubuntu/.cost_report_reminder")
-    
-    reminder_text = """
+# Manus costs (credits per operation), frozen at import
+_COSTS = MappingProxyType({
+    'shell': 1.0,
+    'file_read': 0.5,
+    'file_write': 0.5,
+    'file_edit': 0.5,
+    'search': 20.0,
+    'browser': 30.0,
+    'browser_action': 5.0,
+    'openai': 0.01,
+    'map': 10.0,
+    'generate': 15.0,
+    'mcp': 2.0,
+})
+
+# Reminder shown in-process and mirrored to disk for external tools
+_REMINDER_TEXT = """
 ╔════════════════════════════════════════════════════════════════════╗
 ║                    ⚠️  COST REPORT REQUIRED  ⚠️                     ║
 ╠════════════════════════════════════════════════════════════════════╣
@@ -30,23 +43,21 @@ def create_reminder_file():
 ║                                                                    ║
 ╚════════════════════════════════════════════════════════════════════╝
 """
+
+_REMINDER_PATH = Path("/home/ubuntu/.cost_report_reminder")
+
+
+def create_reminder_file():
+    """Create a reminder file that forces cost reporting"""
+    with open(_REMINDER_PATH, 'w') as f:
+        f.write(_REMINDER_TEXT)
     
-    with open(reminder_path, 'w') as f:
-        f.write(reminder_text)
-    
-    return reminder_path
+    return _REMINDER_PATH
 
 
 def show_reminder():
     """Display the cost reporting reminder"""
-    reminder_path = Path("/home/ubuntu/.cost_report_reminder")
-    
-    if reminder_path.exists():
-        with open(reminder_path, 'r') as f:
-            print(f.read())
-    else:
-        create_reminder_file()
-        show_reminder()
+    print(_REMINDER_TEXT)
 
 
 def generate_simple_cost_report(operations_count: dict) -> str:
@@ -59,32 +70,17 @@ def generate_simple_cost_report(operations_count: dict) -> str:
     Returns:
         Formatted cost report string
     """
-    # Manus costs
-    COSTS = {
-        'shell': 1.0,
-        'file_read': 0.5,
-        'file_write': 0.5,
-        'file_edit': 0.5,
-        'search': 20.0,
-        'browser': 30.0,
-        'browser_action': 5.0,
-        'openai': 0.01,
-        'map': 10.0,
-        'generate': 15.0,
-        'mcp': 2.0,
-    }
-    
-    total_cost = 0
     total_saved = 0
     lines = []
     
-    # Calculate costs
-    for tool, count in sorted(operations_count.items(), 
-                             key=lambda x: -x[1] * COSTS.get(x[0], 0)):
-        cost = COSTS.get(tool, 0)
-        total = count * cost
-        total_cost += total
-        
+    # Calculate costs: (tool, count, total) rows, most expensive first
+    rows = sorted(
+        ((tool, count, count * _COSTS.get(tool, 0)) for tool, count in operations_count.items()),
+        key=lambda row: -row[2]
+    )
+    total_cost = sum(row[2] for row in rows)
+    
+    for tool, count, total in rows:
         # Calculate savings for OpenAI
         if tool == 'openai':
             saved_per = 50.0 - 0.01  # vs search+browser
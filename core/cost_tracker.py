@@ -9,32 +9,152 @@ Fixes BUG-004: No Cost Tracking
 
 import json
 import os
-from datetime import datetime
+import mmap
+import time
+import fcntl
+import atexit
+import functools
+import contextlib
+import threading
+from types import MappingProxyType
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, List
 
+try:
+    import orjson
+    
+    def _dumps(obj) -> bytes:
+        """Compact JSON encoding"""
+        return orjson.dumps(obj)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        """Compact JSON encoding"""
+        return json.dumps(obj, separators=(',', ':')).encode()
+    
+    _loads = json.loads
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    
+    # Columns of the daily Parquet archive (fixed so every part file agrees)
+    _PARQUET_SCHEMA = pa.schema([
+        ('timestamp', pa.string()),
+        ('operation', pa.string()),
+        ('tool_used', pa.string()),
+        ('cost', pa.float64()),
+        ('alternative_tool', pa.string()),
+        ('alternative_cost', pa.float64()),
+        ('savings', pa.float64()),
+        ('savings_percent', pa.float64()),
+        ('reason', pa.string()),
+        ('quality_score', pa.float64()),
+    ])
+    _PARQUET_PARTITIONING = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Cost reference (in credits)
+_COST_TABLE = MappingProxyType({
+    'openai': 0.001,  # Extremely cheap
+    'file_read': 1,
+    'file_write': 2,
+    'shell': 3,
+    'search': 20,
+    'browser': 40,
+    'map_per_item': 10,
+    'generate': 15,
+})
+
+
+def _line_timestamp(line: bytes) -> Optional[bytes]:
+    """Extract the raw ISO timestamp value from a serialized log line"""
+    key = line.find(b'"timestamp"')
+    if key == -1:
+        return None
+    start = line.find(b'"', key + 11)
+    end = line.find(b'"', start + 1)
+    if start == -1 or end == -1:
+        return None
+    return line[start + 1:end]
+
+
+def _tail_offset(mm: mmap.mmap, cutoff_iso: bytes) -> int:
+    """
+    Binary-search a time-ordered JSONL map (or bytes) for the first line after cutoff
+    
+    ISO-8601 timestamps sort lexicographically in chronological order, so
+    they are compared as raw bytes without parsing the lines.
+    
+    If no line is more than S seconds older than a line before it, every
+    line before the offset found for cutoff - S is at or before cutoff.
+    
+    Returns:
+        Byte offset of the first line whose timestamp is after cutoff_iso
+    """
+    lo, hi = 0, len(mm)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = mm.rfind(b'\n', 0, mid) + 1
+        end = mm.find(b'\n', start)
+        if end == -1:
+            end = len(mm)
+        timestamp = _line_timestamp(mm[start:end])
+        if timestamp is not None and timestamp <= cutoff_iso:
+            lo = end + 1
+        else:
+            hi = start
+    return lo
+
+
 class CostTracker:
     """Track costs and savings for all operations"""
     
+    # Buffered operation entries are appended to operations.jsonl once N
+    # are pending, or T seconds after the first of them was logged
+    FLUSH_THRESHOLD = 64
+    FLUSH_INTERVAL = 1.0
+    
+    # Entries reach the log within about FLUSH_INTERVAL of being logged, so
+    # no line is more than this many seconds older than a line before it.
+    # Flushing older entries (e.g. at exit after a stall) marks the log
+    # unordered until the next rotate_to_parquet() sorts it again.
+    ORDER_SLACK = 60
+    
+    # Shared, read-only cost reference
+    COST_TABLE = _COST_TABLE
+    
     def __init__(self, base_path: Path = Path("/home/ubuntu/manus_global_knowledge")):
         self.base_path = base_path
         self.logs_dir = base_path / "logs"
         self.logs_dir.mkdir(exist_ok=True)
         
         self.operations_log = self.logs_dir / "operations.jsonl"
+        
+        # flock()ed shared by appends and exclusively while the log is rewritten
+        self.log_lock_file = self.logs_dir / ".operations.lock"
+        
+        # Present while operations.jsonl holds lines older than ORDER_SLACK
+        # behind newer ones, so it cannot be binary-searched
+        self.unordered_marker = self.logs_dir / ".operations.unordered"
         self.daily_summary = self.logs_dir / "daily_summary.jsonl"
         
-        # Cost reference (in credits)
-        self.COST_TABLE = {
-            'openai': 0.001,  # Extremely cheap
-            'file_read': 1,
-            'file_write': 2,
-            'shell': 3,
-            'search': 20,
-            'browser': 40,
-            'map_per_item': 10,
-            'generate': 15,
-        }
+        # Entries from past days, rotated out of operations.jsonl
+        self.parquet_dir = self.logs_dir / "parquet"
+        
+        self._buffer: List[bytes] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self._flush)
+        
+        # days -> (log mtime_ns, log size, wall-clock second, stats)
+        self._stats_cache: Dict[int, tuple] = {}
     
     def log_operation(
         self,
@@ -78,12 +198,121 @@ class CostTracker:
             'quality_score': quality_score
         }
         
-        # Append to log file
-        with open(self.operations_log, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
+        # Buffer for the log file; written in batches by _flush()
+        with self._buffer_lock:
+            self._buffer.append(_dumps(entry))
+            should_flush = len(self._buffer) >= self.FLUSH_THRESHOLD
+            if not should_flush and self._flush_timer is None:
+                # So a few entries are not held back until the next batch or exit
+                self._flush_timer = threading.Timer(self.FLUSH_INTERVAL, self._flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if should_flush:
+            self._flush()
         
         return entry
     
+    @contextlib.contextmanager
+    def _log_lock(self, exclusive: bool):
+        """
+        Cross-process lock on operations.jsonl
+        
+        Appends hold it shared, so they never block each other; rotation
+        holds it exclusively, so no append lands in the log between reading
+        it and replacing it.
+        """
+        fd = os.open(self.log_lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+    
+    def _flush(self):
+        """Append all buffered operation entries to the log in one write"""
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            slack_iso = (datetime.now() - timedelta(seconds=self.ORDER_SLACK)).isoformat().encode()
+            stale = any(
+                timestamp is not None and timestamp < slack_iso
+                for timestamp in map(_line_timestamp, lines)
+            )
+            with self._log_lock(exclusive=False):
+                if stale:
+                    self.unordered_marker.touch()
+                with open(self.operations_log, 'ab') as f:
+                    f.write(b'\n'.join(lines) + b'\n')
+    
+    def rotate_to_parquet(self) -> int:
+        """
+        Move log entries from before today into the daily Parquet archive
+        
+        Entries are written to parquet/date=YYYY-MM-DD/ (zstd, one part file
+        per rotation) and operations.jsonl keeps only today's entries.
+        get_stats() reads both. Does nothing without pyarrow.
+        
+        Rewrites the log, so it is never run implicitly; call it explicitly
+        (e.g. from a daily job). Appends from other CostTracker instances or
+        processes wait on the log lock until the rewrite is done.
+        
+        Returns:
+            Number of entries moved
+        """
+        if not PYARROW_AVAILABLE:
+            return 0
+        
+        self._flush()
+        with self._buffer_lock, self._log_lock(exclusive=True):
+            try:
+                with open(self.operations_log, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return 0
+            
+            # A bare date sorts before every timestamp of that day. Lines
+            # can be out of order (see ORDER_SLACK), so every line is checked,
+            # and today's are kept sorted by time.
+            today = datetime.now().date().isoformat().encode()
+            by_date: Dict[str, List[Dict]] = {}
+            kept = []
+            for line in data.splitlines():
+                if not line.strip():
+                    continue
+                timestamp = _line_timestamp(line)
+                if timestamp is not None and timestamp < today:
+                    entry = _loads(line)
+                    by_date.setdefault(entry['timestamp'][:10], []).append(entry)
+                else:
+                    kept.append(line)
+            if not by_date:
+                return 0
+            kept.sort(key=lambda line: _line_timestamp(line) or b'')
+            
+            part = f"part-{time.time_ns()}.parquet"
+            for day, entries in by_date.items():
+                day_dir = self.parquet_dir / f"date={day}"
+                day_dir.mkdir(parents=True, exist_ok=True)
+                # Dot-prefixed files are ignored by dataset discovery until renamed
+                pending = day_dir / f".{part}"
+                table = pa.Table.from_pylist(entries, schema=_PARQUET_SCHEMA)
+                pq.write_table(table, str(pending), compression='zstd')
+                os.replace(pending, day_dir / part)
+            
+            pending = self.logs_dir / ".operations.jsonl.tmp"
+            with open(pending, 'wb') as f:
+                f.write(b''.join(line + b'\n' for line in kept))
+            os.replace(pending, self.operations_log)
+            self.unordered_marker.unlink(missing_ok=True)
+        
+        self._stats_cache.clear()
+        return sum(len(entries) for entries in by_date.values())
+    
     def get_stats(self, days: int = 1) -> Dict:
         """
         Get statistics for the last N days
@@ -94,28 +323,109 @@ class CostTracker:
         Returns:
             Dict with statistics
         """
-        if not self.operations_log.exists():
-            return {
-                'total_operations': 0,
-                'total_cost': 0,
-                'total_savings': 0,
-                'avg_quality': 0
+        self._flush()
+        
+        try:
+            log_stat = os.stat(self.operations_log)
+            log_key = (log_stat.st_mtime_ns, log_stat.st_size)
+        except FileNotFoundError:
+            if not self._has_archive():
+                return {
+                    'total_operations': 0,
+                    'total_cost': 0,
+                    'total_savings': 0,
+                    'avg_quality': 0
+                }
+            log_key = (None, None)
+        
+        # Repeated calls within the same second on an unchanged log are free
+        now = time.time()
+        cached = self._stats_cache.get(days)
+        if cached is not None and cached[:3] == (*log_key, int(now)):
+            return dict(cached[3])
+        
+        stats = self._compute_stats(days, now)
+        self._stats_cache[days] = (*log_key, int(now), stats)
+        return dict(stats)
+    
+    def _has_archive(self) -> bool:
+        """Whether rotated Parquet entries exist and can be read"""
+        return PYARROW_AVAILABLE and self.parquet_dir.is_dir()
+    
+    def _archived_totals(self, cutoff: float) -> Optional[Dict]:
+        """
+        Aggregate the archived entries logged after cutoff
+        
+        Only the date partitions in range are opened and only the columns
+        the statistics need are read.
+        
+        Returns:
+            Dict of partial sums, or None if no archived entry is in range
+        """
+        if not self._has_archive():
+            return None
+        
+        cutoff_dt = datetime.fromtimestamp(cutoff)
+        dataset = ds.dataset(str(self.parquet_dir), format='parquet',
+                             partitioning=_PARQUET_PARTITIONING)
+        table = dataset.to_table(
+            columns=['cost', 'savings', 'quality_score', 'tool_used'],
+            filter=(pc.field('date') >= cutoff_dt.date().isoformat())
+                   & (pc.field('timestamp') > cutoff_dt.isoformat())
+        )
+        if table.num_rows == 0:
+            return None
+        
+        quality = table.column('quality_score')
+        usage = table.group_by('tool_used').aggregate([('cost', 'sum'), ('cost', 'count')])
+        return {
+            'count': table.num_rows,
+            'cost': pc.sum(table.column('cost')).as_py(),
+            'savings': pc.sum(table.column('savings')).as_py(),
+            'quality_sum': pc.sum(quality).as_py() or 0,
+            'quality_count': pc.count(quality).as_py(),
+            'tool_usage': {
+                row['tool_used']: {'count': row['cost_count'], 'cost': row['cost_sum']}
+                for row in usage.to_pylist()
             }
+        }
+    
+    def _recent_entries(self, cutoff: float) -> List[Dict]:
+        """
+        Parse only the log entries logged after cutoff
         
-        # Read all entries
-        entries = []
-        with open(self.operations_log, 'r') as f:
-            for line in f:
-                entries.append(json.loads(line))
+        The log is append-only, so entries are in time order give or take
+        ORDER_SLACK: the line ORDER_SLACK before the cutoff is located by
+        binary search over the mapped file and only the tail after it is
+        decoded. A log marked unordered is decoded in full.
+        """
+        try:
+            f = open(self.operations_log, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if self.unordered_marker.exists():
+                    tail = mm[:]
+                else:
+                    cutoff_iso = datetime.fromtimestamp(cutoff - self.ORDER_SLACK).isoformat().encode()
+                    tail = mm[_tail_offset(mm, cutoff_iso):]
         
-        # Filter by date
-        cutoff = datetime.now().timestamp() - (days * 86400)
-        recent_entries = [
+        entries = (_loads(line) for line in tail.splitlines() if line.strip())
+        return [
             e for e in entries
             if datetime.fromisoformat(e['timestamp']).timestamp() > cutoff
         ]
+    
+    def _compute_stats(self, days: int, now: float) -> Dict:
+        """Aggregate statistics over the entries of the last N days"""
+        cutoff = now - (days * 86400)
+        recent_entries = self._recent_entries(cutoff)
+        archived = self._archived_totals(cutoff)
         
-        if not recent_entries:
+        if not recent_entries and archived is None:
             return {
                 'total_operations': 0,
                 'total_cost': 0,
@@ -124,13 +434,25 @@ class CostTracker:
             }
         
         # Calculate stats
+        total_operations = len(recent_entries)
         total_cost = sum(e['cost'] for e in recent_entries)
         total_savings = sum(e['savings'] for e in recent_entries)
         quality_scores = [e['quality_score'] for e in recent_entries if e['quality_score'] is not None]
-        avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
+        quality_sum, quality_count = sum(quality_scores), len(quality_scores)
+        tool_usage = {}
+        
+        # Archived entries arrive pre-aggregated
+        if archived is not None:
+            total_operations += archived['count']
+            total_cost += archived['cost']
+            total_savings += archived['savings']
+            quality_sum += archived['quality_sum']
+            quality_count += archived['quality_count']
+            tool_usage = archived['tool_usage']
+        
+        avg_quality = quality_sum / quality_count if quality_count else 0
         
         # Tool usage breakdown
-        tool_usage = {}
         for entry in recent_entries:
             tool = entry['tool_used']
             if tool not in tool_usage:
@@ -139,13 +461,13 @@ class CostTracker:
             tool_usage[tool]['cost'] += entry['cost']
         
         return {
-            'total_operations': len(recent_entries),
+            'total_operations': total_operations,
             'total_cost': total_cost,
             'total_savings': total_savings,
             'savings_percent': (total_savings / (total_cost + total_savings) * 100) if (total_cost + total_savings) > 0 else 0,
             'avg_quality': avg_quality,
             'tool_usage': tool_usage,
-            'cost_per_operation': total_cost / len(recent_entries) if recent_entries else 0
+            'cost_per_operation': total_cost / total_operations
         }
     
     def generate_daily_summary(self) -> Dict:
@@ -159,8 +481,8 @@ class CostTracker:
         }
         
         # Save to daily summary log
-        with open(self.daily_summary, 'a') as f:
-            f.write(json.dumps(summary) + '\n')
+        with open(self.daily_summary, 'ab') as f:
+            f.write(_dumps(summary) + b'\n')
         
         return summary
     
@@ -191,14 +513,10 @@ class CostTracker:
 
 
 # Convenience functions for easy use
-_tracker = None
-
+@functools.lru_cache(maxsize=1)
 def get_tracker() -> CostTracker:
-    """Get the global cost tracker instance"""
-    global _tracker
-    if _tracker is None:
-        _tracker = CostTracker()
-    return _tracker
+    """Get the global cost tracker instance (get_tracker.cache_clear() resets it)"""
+    return CostTracker()
 
 
 def log_cost(operation: str, tool: str, cost: float, **kwargs):
@@ -13,135 +13,196 @@ Author: MOTHER V3.2
 Version: 1.0.1
 """
 
-import sys
+import io
 import os
+import sys
+import json
 from pathlib import Path
+from typing import Dict, List, Optional, Set, TextIO
+
+# ANSI color codes, only when writing to a terminal (not to logs or pipes)
+_TTY = sys.stdout is not None and sys.stdout.isatty()
+RED = '\033[91m' if _TTY else ''
+GREEN = '\033[92m' if _TTY else ''
+YELLOW = '\033[93m' if _TTY else ''
+BOLD = '\033[1m' if _TTY else ''
+RESET = '\033[0m' if _TTY else ''
+
+# Status marks, plain ASCII when stdout cannot encode emoji
+_UNICODE = bool(sys.stdout is not None and sys.stdout.encoding
+                and 'utf' in sys.stdout.encoding.lower())
+OK_MARK = '✅' if _UNICODE else '[OK]'
+FAIL_MARK = '❌' if _UNICODE else '[FAIL]'
+LOCK_MARK = '🔒 ' if _UNICODE else ''
 
-# ANSI color codes
-RED = '\033[91m'
-GREEN = '\033[92m'
-YELLOW = '\033[93m'
-BOLD = '\033[1m'
-RESET = '\033[0m'
+def list_dir(path: Path) -> Set[str]:
+    """Names of the entries in a directory (empty if it does not exist)."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
 
-def check_file_exists(path: str, description: str) -> bool:
-    """Check if a file exists."""
-    exists = Path(path).exists()
+def check_file_exists(path: str, description: str, listing: Optional[Set[str]] = None,
+                      out: Optional[TextIO] = None) -> bool:
+    """
+    Check if a file exists.
+    
+    If listing (the names in the file's directory, from list_dir) is given,
+    it is checked in memory instead of with a stat call. The result line
+    goes to out (default: stdout).
+    """
+    if listing is not None:
+        exists = os.path.basename(path) in listing
+    else:
+        exists = Path(path).exists()
     if exists:
-        print(f"   ✅ {description}")
+        print(f"   {OK_MARK} {description}", file=out)
     else:
-        print(f"   ❌ {description} - MISSING: {path}")
+        print(f"   {FAIL_MARK} {description} - MISSING: {path}", file=out)
     return exists
 
 def critical_enforcement_check() -> bool:
     """
     Perform critical enforcement check.
     Returns True if 100% compliant, False otherwise.
+    
+    The report is built in memory and written to stdout in one go, so
+    concurrent checks do not interleave. With ENFORCEMENT_JSON=1 the
+    results are also written to stderr as a JSON line.
     """
-    print(f"\n{BOLD}🔒 CRITICAL ENFORCEMENT CHECK{RESET}")
-    print("=" * 60)
+    buf = io.StringIO()
+    results: List[Dict] = []
+    
+    def check(path: str, description: str, listing: Set[str]) -> bool:
+        exists = check_file_exists(path, description, listing, out=buf)
+        results.append({'check': description, 'path': path, 'exists': exists})
+        return exists
+    
+    print(f"\n{BOLD}{LOCK_MARK}CRITICAL ENFORCEMENT CHECK{RESET}", file=buf)
+    print("=" * 60, file=buf)
     
     base_path = Path("/home/ubuntu/manus_global_knowledge")
     all_checks_passed = True
     
+    # One directory scan each instead of a stat per checked file
+    root_files = list_dir(base_path)
+    core_files = list_dir(base_path / "core")
+    
     # Check 1: Core Operating System
-    print(f"\n{BOLD}1. Core Operating System (P1-P5){RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}1. Core Operating System (P1-P5){RESET}", file=buf)
+    if not check(
         str(base_path / "MANUS_OPERATING_SYSTEM.md"),
-        "MANUS_OPERATING_SYSTEM.md"
+        "MANUS_OPERATING_SYSTEM.md",
+        root_files
     ):
         all_checks_passed = False
     
     # Check 2: P3 Cost Optimization Enforcement
-    print(f"\n{BOLD}2. P3 Cost Optimization Enforcement{RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}2. P3 Cost Optimization Enforcement{RESET}", file=buf)
+    if not check(
         str(base_path / "core" / "P3_COST_OPTIMIZATION_ENFORCED.md"),
-        "P3_COST_OPTIMIZATION_ENFORCED.md"
+        "P3_COST_OPTIMIZATION_ENFORCED.md",
+        core_files
     ):
         all_checks_passed = False
     
     # Check 3: Scientific Method Enforcement
-    print(f"\n{BOLD}3. Scientific Method Enforcement{RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}3. Scientific Method Enforcement{RESET}", file=buf)
+    if not check(
         str(base_path / "core" / "SCIENTIFIC_METHODOLOGY_REQUIREMENTS.md"),
-        "SCIENTIFIC_METHODOLOGY_REQUIREMENTS.md"
+        "SCIENTIFIC_METHODOLOGY_REQUIREMENTS.md",
+        core_files
     ):
         all_checks_passed = False
     
     # Check 4: Bibliographic References
-    print(f"\n{BOLD}4. Bibliographic References System{RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}4. Bibliographic References System{RESET}", file=buf)
+    if not check(
         str(base_path / "core" / "BIBLIOGRAPHIC_REFERENCES.md"),
-        "BIBLIOGRAPHIC_REFERENCES.md"
+        "BIBLIOGRAPHIC_REFERENCES.md",
+        core_files
     ):
         all_checks_passed = False
     
     # Check 5: Anna's Archive Integration
-    print(f"\n{BOLD}5. Anna's Archive Integration (P1){RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}5. Anna's Archive Integration (P1){RESET}", file=buf)
+    if not check(
         str(base_path / "core" / "annas_archive_workflow.py"),
-        "annas_archive_workflow.py"
+        "annas_archive_workflow.py",
+        core_files
     ):
         all_checks_passed = False
     
     # Check 6: Cost Reporting System
-    print(f"\n{BOLD}6. Cost Reporting System{RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}6. Cost Reporting System{RESET}", file=buf)
+    if not check(
         str(base_path / "core" / "cost_reporting_reminder.py"),
-        "cost_reporting_reminder.py"
+        "cost_reporting_reminder.py",
+        core_files
     ):
         all_checks_passed = False
     
     # Check 7: Visual Identity
-    print(f"\n{BOLD}7. Visual Identity System{RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}7. Visual Identity System{RESET}", file=buf)
+    if not check(
         str(base_path / "core" / "visual_identity_detector.py"),
-        "visual_identity_detector.py"
+        "visual_identity_detector.py",
+        core_files
     ):
         all_checks_passed = False
 
     # Check 9: Citation Integrity Protocol
-    print(f"\n{BOLD}9. Citation Integrity Protocol{RESET}")
-    if not check_file_exists(
+    print(f"\n{BOLD}9. Citation Integrity Protocol{RESET}", file=buf)
+    if not check(
         str(base_path / "core" / "CITATION_INTEGRITY_PROTOCOL.md"),
-        "CITATION_INTEGRITY_PROTOCOL.md"
+        "CITATION_INTEGRITY_PROTOCOL.md",
+        core_files
     ):
         all_checks_passed = False
     
     # Check 8: Guardian Validation
-    print(f"\n{BOLD}8. Guardian Quality Validation{RESET}")
+    print(f"\n{BOLD}8. Guardian Quality Validation{RESET}", file=buf)
     guardian_found = False
-    if check_file_exists(
+    if check(
         str(base_path / "core" / "guardian.py"),
-        "guardian.py"
+        "guardian.py",
+        core_files
     ):
         guardian_found = True
-    if check_file_exists(
+    if check(
         str(base_path / "core" / "guardian_validator.py"),
-        "guardian_validator.py"
+        "guardian_validator.py",
+        core_files
     ):
         guardian_found = True
     
     if not guardian_found:
-        print(f"   ❌ No Guardian validator found")
+        print(f"   {FAIL_MARK} No Guardian validator found", file=buf)
         all_checks_passed = False
     
     # Final verdict
-    print("\n" + "=" * 60)
+    print("\n" + "=" * 60, file=buf)
     if all_checks_passed:
-        print(f"{GREEN}{BOLD}✅ ENFORCEMENT CHECK PASSED: 100% COMPLIANCE{RESET}")
-        print(f"{GREEN}All MOTHER systems are active and operational.{RESET}")
-        print(f"{GREEN}Task execution is AUTHORIZED.{RESET}\n")
-        return True
+        print(f"{GREEN}{BOLD}{OK_MARK} ENFORCEMENT CHECK PASSED: 100% COMPLIANCE{RESET}", file=buf)
+        print(f"{GREEN}All MOTHER systems are active and operational.{RESET}", file=buf)
+        print(f"{GREEN}Task execution is AUTHORIZED.{RESET}\n", file=buf)
     else:
-        print(f"{RED}{BOLD}❌ ENFORCEMENT CHECK FAILED: < 100% COMPLIANCE{RESET}")
-        print(f"{RED}MOTHER systems are NOT fully operational.{RESET}")
-        print(f"{RED}{BOLD}TASK EXECUTION IS BLOCKED.{RESET}")
-        print(f"\n{YELLOW}ACTION REQUIRED:{RESET}")
-        print(f"  1. Fix missing enforcement files")
-        print(f"  2. Re-run bootstrap.sh")
-        print(f"  3. Verify 100% compliance before proceeding\n")
-        return False
+        print(f"{RED}{BOLD}{FAIL_MARK} ENFORCEMENT CHECK FAILED: < 100% COMPLIANCE{RESET}", file=buf)
+        print(f"{RED}MOTHER systems are NOT fully operational.{RESET}", file=buf)
+        print(f"{RED}{BOLD}TASK EXECUTION IS BLOCKED.{RESET}", file=buf)
+        print(f"\n{YELLOW}ACTION REQUIRED:{RESET}", file=buf)
+        print(f"  1. Fix missing enforcement files", file=buf)
+        print(f"  2. Re-run bootstrap.sh", file=buf)
+        print(f"  3. Verify 100% compliance before proceeding\n", file=buf)
+    
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+    
+    if os.environ.get('ENFORCEMENT_JSON') == '1':
+        sys.stderr.write(json.dumps({'passed': all_checks_passed, 'checks': results}) + '\n')
+    
+    return all_checks_passed
 
 if __name__ == "__main__":
     # Run critical check
@@ -18,11 +18,125 @@ References:
 [3] Deming, W. E. (1986). Out of the Crisis. MIT Press.
 """
 
+import os
+import re
+import gzip
 import json
+import time
+import fcntl
+import atexit
+import contextlib
+import weakref
+from array import array
+from bisect import insort
+from collections import Counter, deque
 from pathlib import Path
-from datetime import datetime
 from typing import Dict, List, Optional
-import statistics
+
+try:
+    import orjson
+    
+    def _dumps(obj, indent: bool = False) -> bytes:
+        """JSON-encode to bytes (compact, or indented by 2)"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj, indent: bool = False) -> bytes:
+        """JSON-encode to bytes (compact, or indented by 2)"""
+        if indent:
+            return json.dumps(obj, indent=2).encode()
+        return json.dumps(obj, separators=(',', ':')).encode()
+    
+    _loads = json.loads
+
+# Keywords counted as lesson themes, as whole words
+THEME_KEYWORDS = ("cost", "quality", "speed", "accuracy", "error", "optimization", "decision")
+_THEME_SET = frozenset(THEME_KEYWORDS)
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _count_themes(text: str, counts: Counter):
+    """Add the theme keywords among the words of (lowercase) text to counts"""
+    counts.update(word for word in _WORD_RE.findall(text) if word in _THEME_SET)
+
+
+# Local time of the current second, formatted once per second
+_ts_cache = {'sec': None, 'prefix': ''}
+
+
+def _now_iso() -> str:
+    """datetime.now().isoformat(), reusing the date and time of day formatted this second"""
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    if sec != _ts_cache['sec']:
+        _ts_cache['prefix'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(sec))
+        _ts_cache['sec'] = sec
+    micro = ns // 1000
+    return f"{_ts_cache['prefix']}.{micro:06d}" if micro else _ts_cache['prefix']
+
+
+# Block size for reading JSONL logs backwards
+_TAIL_CHUNK = 8192
+
+
+def _write_all(fd: int, data: bytes):
+    """os.write until all of data is written"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+    view.release()
+
+
+def _tail(path: Path, count: int) -> List[Dict]:
+    """
+    Parse the last `count` entries of a JSONL file.
+    
+    Reads backwards from the end in fixed-size blocks until enough lines
+    are buffered, so the cost does not grow with the size of the file.
+    Blank lines are skipped; count <= 0 slices like entries[-count:].
+    """
+    if count <= 0:
+        with open(path, 'rb') as f:
+            return [_loads(line) for line in f if line.strip()][-count:]
+    
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b''
+        lines = []
+        while pos > 0 and len(lines) < count:
+            step = min(_TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            # Until the start of the file is reached the first line may be cut off
+            lines = [line for line in data.splitlines()[1 if pos else 0:] if line.strip()]
+    
+    return [_loads(line) for line in lines[-count:]]
+
+
+def _index_ratings(f, offset: int) -> array:
+    """(end offset, rating) index records of the JSONL lines from offset on"""
+    records = array('d')
+    f.seek(offset)
+    for line in f:
+        offset += len(line)
+        if line.strip():
+            records.extend((offset, _loads(line)["rating"]))
+    return records
+
+
+# Systems whose buffered feedback is written at exit; held weakly so that
+# the exit hook does not keep every system ever created alive
+_live_systems = weakref.WeakSet()
+
+
+def _flush_live_systems():
+    """Flush every FeedbackLoopSystem still alive at exit"""
+    for system in list(_live_systems):
+        system.flush()
+
+
+atexit.register(_flush_live_systems)
 
 
 class FeedbackLoopSystem:
@@ -36,7 +150,36 @@ class FeedbackLoopSystem:
     - Automatic improvement suggestions
     """
     
+    # The analysis file is rewritten at most every N changed analyses or
+    # T seconds; flush() writes whatever is pending
+    ANALYSIS_WRITE_EVERY = 10
+    ANALYSIS_WRITE_INTERVAL = 5.0
+    
+    # Feedback lines are appended in batches of up to N lines, or sooner
+    # when T seconds have passed since the last write
+    LOG_FLUSH_LINES = 16
+    LOG_FLUSH_INTERVAL = 0.1
+    
+    # Logs with more ratings than this are seeded with NumPy, if installed
+    NUMPY_MIN_RATINGS = 1024
+    
+    # Past this size the feedback log is archived as feedback_log.N.jsonl.gz
+    # next to summary_N.json, and a new log is started
+    LOG_ROTATE_BYTES = 10 << 20
+    
+    # Ratings making up the "recent" side of the trend
+    RECENT_RATINGS = 10
+    
     def __init__(self, base_path: str = "/home/ubuntu/manus_global_knowledge"):
+        # Buffered feedback lines and the append-only log descriptors,
+        # opened below once the ratings index is in step with the log
+        self._log_fd = self._ratings_fd = None
+        self._log_size = 0
+        self._log_buf = bytearray()
+        self._ratings_buf = array('d')
+        self._log_lines = 0
+        self._last_log_flush = float('-inf')
+        
         self.base_path = Path(base_path)
         self.feedback_dir = self.base_path / "feedback"
         self.feedback_dir.mkdir(parents=True, exist_ok=True)
@@ -44,8 +187,192 @@ class FeedbackLoopSystem:
         self.feedback_file = self.feedback_dir / "feedback_log.jsonl"
         self.analysis_file = self.feedback_dir / "feedback_analysis.json"
         
+        # Binary index of the log's ratings, so startup does not have to
+        # parse the JSON: one (end offset, rating) float64 pair per log line
+        self.ratings_file = self.feedback_dir / "feedback_ratings.bin"
+        
+        # Held while appending to the log and its index, or rotating them,
+        # by every system (and process) sharing this directory
+        self.log_lock_file = self.feedback_dir / ".feedback.lock"
+        
+        # Running rating statistics, updated per feedback instead of
+        # re-reading the whole log on every analysis; seeded on the first
+        # analysis (see _seed_state)
+        self._state = None
+        
+        # Numbers of the rotated logs, oldest first
+        self._archives = self._scan_archives()
+        
+        # Latest analysis not yet written, and the hash of the latest one
+        # (ignoring last_updated) to skip analyses where nothing changed
+        self._analysis = None
+        self._analysis_hash = None
+        self._writes_since = 0
+        self._last_write = float('-inf')
+        
+        # The ratings index is brought up to date before appending to it,
+        # as a log written before the index existed has none
+        with self._log_lock():
+            self._sync_ratings()
+            self._open_logs()
+        _live_systems.add(self)
+        
         print("🔄 Feedback Loop System initialized")
     
+    def _seed_state(self):
+        """Build the running statistics from the rotated log summaries and the log"""
+        self._state = {
+            'count': 0,
+            'sum': 0,
+            'sorted': array('d'),      # all ratings, kept sorted for the median
+            'counts': Counter(),       # rating -> occurrences
+            'recent': deque(maxlen=self.RECENT_RATINGS)
+        }
+        for number in self._archives:
+            with open(self._summary_file(number), 'rb') as f:
+                self._add_summary(_loads(f.read()))
+        self._add_ratings(self._load_ratings())
+    
+    def _scan_archives(self) -> List[int]:
+        """Numbers of the rotated logs on disk, oldest first"""
+        return sorted(
+            int(match.group(1)) for match in
+            (re.fullmatch(r'summary_(\d+)\.json', path.name) for path in self.feedback_dir.iterdir())
+            if match
+        )
+    
+    @contextlib.contextmanager
+    def _log_lock(self):
+        """Exclusive cross-process lock on the feedback log and its index"""
+        fd = os.open(self.log_lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+    
+    def _open_logs(self, truncate_ratings: bool = False):
+        """Open the append-only descriptors of the log and its index (under the log lock)"""
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        log_fd = os.open(self.feedback_file, flags, 0o644)
+        try:
+            ratings_fd = os.open(self.ratings_file, flags | (os.O_TRUNC if truncate_ratings else 0), 0o644)
+        except OSError:
+            os.close(log_fd)
+            raise
+        self._log_fd, self._ratings_fd = log_fd, ratings_fd
+        self._log_size = os.fstat(log_fd).st_size
+    
+    def _sync_ratings(self):
+        """
+        Index the log lines past the last indexed one (under the log lock)
+        
+        Index records pair each rating with the log offset just past its
+        line, so only the log bytes after the last record are read (all of
+        them for a log written before the index existed). If that offset
+        is not the end of a line, or the lines after it do not parse, the
+        index does not match the log (e.g. the log was replaced) and is
+        rebuilt from the whole log.
+        """
+        record = 2 * array('d').itemsize
+        with open(self.feedback_file, 'a+b') as log, open(self.ratings_file, 'a+b') as index:
+            log_size = log.seek(0, os.SEEK_END)
+            size = index.seek(0, os.SEEK_END)
+            indexed = size - size % record  # drops a torn last record
+            covered = 0
+            if indexed:
+                index.seek(indexed - record)
+                last = array('d')
+                last.frombytes(index.read(record))
+                covered = int(last[0])
+                if 0 < covered <= log_size:
+                    log.seek(covered - 1)
+                    aligned = log.read(1) == b'\n'
+                else:
+                    aligned = False
+                if not aligned:
+                    indexed = covered = 0
+            
+            try:
+                missing = _index_ratings(log, covered)
+            except (ValueError, KeyError):
+                if not covered:
+                    raise
+                indexed = 0
+                missing = _index_ratings(log, 0)
+            if indexed != size:
+                index.truncate(indexed)
+            index.write(missing.tobytes())
+    
+    def _load_ratings(self) -> array:
+        """Ratings of the feedback log, in order, as read from the (synced) index"""
+        index = array('d')
+        with open(self.ratings_file, 'rb') as f:
+            data = f.read()
+        index.frombytes(data[:len(data) - len(data) % (2 * index.itemsize)])
+        return index[1::2]
+    
+    def _summary_file(self, number: int) -> Path:
+        """Summary of the Nth rotated log"""
+        return self.feedback_dir / f"summary_{number}.json"
+    
+    def _archive_file(self, number: int) -> Path:
+        """The Nth rotated log, gzipped"""
+        return self.feedback_dir / f"feedback_log.{number}.jsonl.gz"
+    
+    def _add_summary(self, summary: Dict):
+        """Fold the statistics of a rotated log into the running statistics"""
+        state = self._state
+        counts = Counter({rating: n for rating, n in summary["counts"]})
+        state['count'] += summary["count"]
+        state['sum'] += summary["sum"]
+        state['counts'].update(counts)
+        state['sorted'] = array('d', sorted([*state['sorted'], *counts.elements()]))
+        state['recent'].extend(summary["recent"])
+    
+    def _add_rating(self, rating):
+        """Fold one rating into the running statistics"""
+        state = self._state
+        state['count'] += 1
+        state['sum'] += rating
+        insort(state['sorted'], rating)
+        state['counts'][rating] += 1
+        state['recent'].append(rating)
+    
+    def _add_ratings(self, ratings: array):
+        """
+        Fold a batch of ratings (e.g. the existing log) into the statistics
+        
+        ratings is a float64 array as read from the ratings index.
+        """
+        state = self._state
+        np = None
+        if len(ratings) > self.NUMPY_MIN_RATINGS:
+            try:
+                import numpy as np
+            except ImportError:
+                pass
+        
+        if np is not None:
+            # One vectorized sort/count pass over a zero-copy view of the array
+            values = np.frombuffer(ratings, dtype=np.float64)
+            unique, counts = np.unique(values, return_counts=True)
+            state['sum'] += values.sum().item()
+            state['counts'].update(dict(zip(unique.tolist(), counts.tolist())))
+            merged = np.sort(np.concatenate((np.frombuffer(state['sorted'], dtype=np.float64), values)))
+            state['sorted'] = array('d', merged.tobytes())
+            recent = values[-state['recent'].maxlen:].tolist()
+        else:
+            values = ratings.tolist()
+            state['sum'] += sum(values)
+            state['counts'].update(values)
+            state['sorted'] = array('d', sorted([*state['sorted'], *values]))
+            recent = values[-state['recent'].maxlen:]
+        
+        state['count'] += len(values)
+        state['recent'].extend(recent)
+    
     def collect_feedback(self, feedback_data: Dict) -> bool:
         """
         Collect feedback from user.
@@ -71,59 +398,72 @@ class FeedbackLoopSystem:
         
         # Add timestamp if not present
         if "timestamp" not in feedback_data:
-            feedback_data["timestamp"] = datetime.now().isoformat()
-        
-        # Append to feedback log
-        with open(self.feedback_file, 'a') as f:
-            f.write(json.dumps(feedback_data) + '\n')
+            feedback_data["timestamp"] = _now_iso()
+        
+        # Append to feedback log (buffered, see _flush_log)
+        self._log_buf += _dumps(feedback_data)
+        self._log_buf += b'\n'
+        # Offsets are relative to the buffer until it is written
+        self._ratings_buf.extend((len(self._log_buf), feedback_data["rating"]))
+        self._log_lines += 1
+        if (self._log_lines >= self.LOG_FLUSH_LINES
+                or time.monotonic() - self._last_log_flush > self.LOG_FLUSH_INTERVAL):
+            self._flush_log()
         
         print(f"✅ Feedback collected: {feedback_data['rating']}⭐ for task {feedback_data['task_id']}")
         
         # Trigger analysis if enough feedback collected
-        self._analyze_feedback()
+        self._analyze_feedback(feedback_data)
         
         return True
     
-    def _analyze_feedback(self):
-        """Analyze collected feedback and generate insights"""
-        if not self.feedback_file.exists():
-            return
-        
-        # Load all feedback
-        feedback_list = []
-        with open(self.feedback_file, 'r') as f:
-            for line in f:
-                if line.strip():
-                    feedback_list.append(json.loads(line))
-        
-        if len(feedback_list) < 5:
+    def _analyze_feedback(self, new_entry: Dict):
+        """Fold new_entry into the statistics, then analyze all feedback so far"""
+        if self._state is None:
+            # Cold start: seed from disk, which holds new_entry once flushed
+            self._flush_log()
+            self._seed_state()
+        else:
+            self._add_rating(new_entry["rating"])
+        
+        state = self._state
+        count = state['count']
+        if count < 5:
             return  # Need at least 5 feedback entries for analysis
         
         # Calculate statistics
-        ratings = [f["rating"] for f in feedback_list]
+        ratings = state['sorted']
+        counts = state['counts']
+        middle = count // 2
+        if count % 2:
+            # Integral ratings come back from the float64 array as ints, as
+            # statistics.median over the logged ratings would return them
+            median = ratings[middle]
+            median = int(median) if median.is_integer() else median
+        else:
+            median = (ratings[middle - 1] + ratings[middle]) / 2
         
         analysis = {
-            "total_feedback": len(feedback_list),
-            "average_rating": statistics.mean(ratings),
-            "median_rating": statistics.median(ratings),
+            "total_feedback": count,
+            "average_rating": state['sum'] / count,
+            "median_rating": median,
             "rating_distribution": {
-                "5_star": ratings.count(5),
-                "4_star": ratings.count(4),
-                "3_star": ratings.count(3),
-                "2_star": ratings.count(2),
-                "1_star": ratings.count(1)
+                "5_star": counts[5],
+                "4_star": counts[4],
+                "3_star": counts[3],
+                "2_star": counts[2],
+                "1_star": counts[1]
             },
-            "satisfaction_rate": (ratings.count(4) + ratings.count(5)) / len(ratings) * 100,
-            "last_updated": datetime.now().isoformat()
+            "satisfaction_rate": (counts[4] + counts[5]) / count * 100,
+            "last_updated": _now_iso()
         }
         
-        # Identify trends
-        if len(feedback_list) >= 10:
-            recent_ratings = ratings[-10:]
-            older_ratings = ratings[:-10]
-            
-            recent_avg = statistics.mean(recent_ratings)
-            older_avg = statistics.mean(older_ratings)
+        # Identify trends (the last 10 ratings against all earlier ones)
+        recent = state['recent']
+        if count > len(recent) == recent.maxlen:
+            recent_sum = sum(recent)
+            recent_avg = recent_sum / len(recent)
+            older_avg = (state['sum'] - recent_sum) / (count - len(recent))
             
             analysis["trend"] = {
                 "recent_average": recent_avg,
@@ -150,31 +490,152 @@ class FeedbackLoopSystem:
         analysis["recommendations"] = recommendations
         
         # Save analysis
-        with open(self.analysis_file, 'w') as f:
-            json.dump(analysis, f, indent=2)
+        self._save_analysis(analysis)
         
         print(f"📊 Feedback analysis updated: {analysis['average_rating']:.2f}⭐ average")
     
+    def _save_analysis(self, analysis: Dict):
+        """Queue an analysis for writing, skipping it if nothing changed"""
+        content = {k: v for k, v in analysis.items() if k != "last_updated"}
+        content_hash = hash(_dumps(content))
+        if content_hash == self._analysis_hash:
+            return
+        
+        self._analysis = analysis
+        self._analysis_hash = content_hash
+        self._writes_since += 1
+        if (self._writes_since >= self.ANALYSIS_WRITE_EVERY
+                or time.monotonic() - self._last_write > self.ANALYSIS_WRITE_INTERVAL):
+            self._flush_analysis()
+    
+    def flush(self):
+        """Write buffered feedback and the pending analysis (also run at exit)"""
+        self._flush_log()
+        self._flush_analysis()
+    
+    def close(self):
+        """Flush and close the feedback log"""
+        self.flush()
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            os.close(self._ratings_fd)
+            self._log_fd = self._ratings_fd = None
+        _live_systems.discard(self)
+    
+    def __del__(self):
+        # The exit hook holds systems weakly, so one dropped without
+        # close() writes its buffered feedback here
+        if getattr(self, '_ratings_fd', None) is not None:
+            self.close()
+    
+    def _flush_log(self):
+        """Append all buffered feedback lines (and their ratings) with a single write each"""
+        if self._log_buf and self._log_fd is not None:
+            with self._log_lock():
+                # Another system sharing the log may have rotated it
+                if not os.path.samestat(os.fstat(self._log_fd), os.stat(self.feedback_file)):
+                    os.close(self._log_fd)
+                    os.close(self._ratings_fd)
+                    self._open_logs()
+                
+                # O_APPEND puts the lines at the end of the file, after any
+                # appended by other systems, so the offsets are taken from there
+                _write_all(self._log_fd, self._log_buf)
+                self._log_size = os.fstat(self._log_fd).st_size
+                start = self._log_size - len(self._log_buf)
+                records = self._ratings_buf
+                for i in range(0, len(records), 2):
+                    records[i] += start
+                _write_all(self._ratings_fd, records.tobytes())
+                
+                self._log_buf.clear()
+                del self._ratings_buf[:]
+                self._log_lines = 0
+                if self._log_size > self.LOG_ROTATE_BYTES:
+                    self._rotate_log()
+        self._last_log_flush = time.monotonic()
+    
+    def _rotate_log(self):
+        """
+        Archive the feedback log and start a new one
+        
+        The log is gzipped (fast level) to feedback_log.N.jsonl.gz and its
+        ratings are condensed into summary_N.json (count, sum, per-rating
+        counts and the last ratings), which is all a later startup needs
+        to resume the statistics without opening the archive. Called with
+        the log lock held.
+        """
+        ratings = self._load_ratings().tolist()
+        recent_len = self.RECENT_RATINGS
+        summary = {
+            "count": len(ratings),
+            "sum": sum(ratings),
+            "counts": sorted(Counter(ratings).items()),
+            "recent": ratings[-recent_len:]
+        }
+        
+        self._archives = self._scan_archives()
+        number = self._archives[-1] + 1 if self._archives else 1
+        summary_file = self._summary_file(number)
+        archive_file = self._archive_file(number)
+        rotated_file = archive_file.with_suffix('')
+        
+        os.close(self._log_fd)
+        os.close(self._ratings_fd)
+        
+        # Summary goes live together with the archive, never before it
+        pending = summary_file.with_name('.' + summary_file.name)
+        with open(pending, 'wb') as f:
+            f.write(_dumps(summary))
+        os.replace(self.feedback_file, rotated_file)
+        os.replace(pending, summary_file)
+        self._archives.append(number)
+        
+        with open(rotated_file, 'rb') as src, gzip.open(archive_file, 'wb', compresslevel=1) as dst:
+            while True:
+                block = src.read(1 << 20)
+                if not block:
+                    break
+                dst.write(block)
+        rotated_file.unlink()
+        
+        self._open_logs(truncate_ratings=True)
+    
+    def _flush_analysis(self):
+        """Write the pending analysis, if any"""
+        if self._analysis is None:
+            return
+        
+        with open(self.analysis_file, 'wb') as f:
+            f.write(_dumps(self._analysis, indent=True))
+        
+        self._analysis = None
+        self._writes_since = 0
+        self._last_write = time.monotonic()
+    
     def get_analysis(self) -> Optional[Dict]:
         """Get current feedback analysis"""
+        self.flush()
         if not self.analysis_file.exists():
             return None
         
-        with open(self.analysis_file, 'r') as f:
-            return json.load(f)
+        with open(self.analysis_file, 'rb') as f:
+            return _loads(f.read())
     
     def get_recent_feedback(self, count: int = 10) -> List[Dict]:
         """Get recent feedback entries"""
-        if not self.feedback_file.exists():
-            return []
-        
-        feedback_list = []
-        with open(self.feedback_file, 'r') as f:
-            for line in f:
-                if line.strip():
-                    feedback_list.append(json.loads(line))
-        
-        return feedback_list[-count:]
+        self._flush_log()
+        entries = _tail(self.feedback_file, count) if self.feedback_file.exists() else []
+        
+        # Older entries come from the rotated logs, newest archive first
+        for number in reversed(self._archives):
+            if 0 < count <= len(entries):
+                break
+            with gzip.open(self._archive_file(number), 'rb') as f:
+                archived = [_loads(line) for line in f if line.strip()]
+            entries = archived[-(count - len(entries)):] + entries if count > 0 else archived + entries
+        
+        return entries
 
 
 class ContinuousLearningEngine:
@@ -220,12 +681,13 @@ class ContinuousLearningEngine:
             return False
         
         # Add metadata
-        lesson_data["timestamp"] = datetime.now().isoformat()
-        lesson_data["lesson_id"] = f"LESSON_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        timestamp = _now_iso()
+        lesson_data["timestamp"] = timestamp
+        lesson_data["lesson_id"] = f"LESSON_{timestamp[:10].replace('-', '')}_{timestamp[11:19].replace(':', '')}"
         
         # Append to lessons log
-        with open(self.lessons_file, 'a') as f:
-            f.write(json.dumps(lesson_data) + '\n')
+        with open(self.lessons_file, 'ab') as f:
+            f.write(_dumps(lesson_data) + b'\n')
         
         print(f"✅ Lesson captured: {lesson_data['lesson_id']}")
         
@@ -239,41 +701,39 @@ class ContinuousLearningEngine:
         if not self.lessons_file.exists():
             return
         
-        # Load all lessons
-        lessons = []
-        with open(self.lessons_file, 'r') as f:
-            for line in f:
-                if line.strip():
-                    lessons.append(json.loads(line))
+        # Count outcomes, principles and theme keywords in one streaming
+        # pass, without holding the lessons in memory
+        total = 0
+        by_outcome = Counter()
+        by_principle = Counter()
+        keyword_counts = Counter()
         
-        if len(lessons) < 5:
+        with open(self.lessons_file, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                lesson = _loads(line)
+                total += 1
+                by_outcome[lesson.get("outcome", "unknown")] += 1
+                by_principle[lesson.get("principle", "unknown")] += 1
+                
+                # Identify common themes (simple keyword extraction)
+                _count_themes(lesson.get("lesson", "").lower(), keyword_counts)
+        
+        if total < 5:
             return  # Need at least 5 lessons for pattern recognition
         
         # Analyze patterns
         patterns = {
-            "total_lessons": len(lessons),
-            "by_outcome": {},
-            "by_principle": {},
+            "total_lessons": total,
+            "by_outcome": dict(by_outcome),
+            "by_principle": dict(by_principle),
             "common_themes": [],
-            "last_updated": datetime.now().isoformat()
+            "last_updated": _now_iso()
         }
         
-        # Count by outcome
-        for lesson in lessons:
-            outcome = lesson.get("outcome", "unknown")
-            patterns["by_outcome"][outcome] = patterns["by_outcome"].get(outcome, 0) + 1
-        
-        # Count by principle
-        for lesson in lessons:
-            principle = lesson.get("principle", "unknown")
-            patterns["by_principle"][principle] = patterns["by_principle"].get(principle, 0) + 1
-        
-        # Identify common themes (simple keyword extraction)
-        all_lessons_text = " ".join([l.get("lesson", "") for l in lessons])
-        keywords = ["cost", "quality", "speed", "accuracy", "error", "optimization", "decision"]
-        
-        for keyword in keywords:
-            count = all_lessons_text.lower().count(keyword)
+        for keyword in THEME_KEYWORDS:
+            count = keyword_counts[keyword]
             if count >= 3:
                 patterns["common_themes"].append({
                     "theme": keyword,
@@ -281,8 +741,8 @@ class ContinuousLearningEngine:
                 })
         
         # Save patterns
-        with open(self.patterns_file, 'w') as f:
-            json.dump(patterns, f, indent=2)
+        with open(self.patterns_file, 'wb') as f:
+            f.write(_dumps(patterns, indent=True))
         
         print(f"🔍 Patterns identified: {len(patterns['common_themes'])} themes found")
     
@@ -291,21 +751,15 @@ class ContinuousLearningEngine:
         if not self.patterns_file.exists():
             return None
         
-        with open(self.patterns_file, 'r') as f:
-            return json.load(f)
+        with open(self.patterns_file, 'rb') as f:
+            return _loads(f.read())
     
     def get_recent_lessons(self, count: int = 10) -> List[Dict]:
         """Get recent lessons learned"""
         if not self.lessons_file.exists():
             return []
         
-        lessons = []
-        with open(self.lessons_file, 'r') as f:
-            for line in f:
-                if line.strip():
-                    lessons.append(json.loads(line))
-        
-        return lessons[-count:]
+        return _tail(self.lessons_file, count)
     
     def apply_lesson(self, lesson_id: str) -> bool:
         """
@@ -10,15 +10,159 @@ instructions with human feedback" (InstructGPT)
 """
 
 import os
-from openai import OpenAI
-from typing import Dict, Optional
+import json
+import asyncio
+import hashlib
+import functools
+from collections import OrderedDict
+import httpx
+from openai import AsyncOpenAI, DefaultHttpxClient, OpenAI, OpenAIError
+from typing import Dict, List, Optional
+
+# HTTP/2 lets the shared pool multiplex requests (httpx needs h2 for it)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+# Scoring is a short structured task, so it uses the small model
+VALIDATION_MODEL = "gpt-4o-mini"
+IMPROVEMENT_MODEL = "gpt-4o"
+
+_SCORE_PROPERTY = {"type": "integer", "description": "0-100"}
+
+# Function the validator must call with its rating (replaces a JSON
+# format spelled out in the prompt)
+_SCORE_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "score",
+        "description": "Record the quality rating of the output",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "overall_score": _SCORE_PROPERTY,
+                "accuracy": _SCORE_PROPERTY,
+                "completeness": _SCORE_PROPERTY,
+                "clarity": _SCORE_PROPERTY,
+                "relevance": _SCORE_PROPERTY,
+                "feedback": {"type": "string", "description": "Brief explanation of the score"},
+                "improvements": {"type": "string", "description": "Suggestions for improvement if score < 80"}
+            },
+            "required": [
+                "overall_score", "accuracy", "completeness", "clarity",
+                "relevance", "feedback", "improvements"
+            ]
+        }
+    }
+}
+_SCORE_TOOL_CHOICE = {"type": "function", "function": {"name": "score"}}
+
+# Longer outputs are shown to the validator as head + tail windows
+MAX_OUTPUT_TOKENS = 4000
+_TRUNCATION_MARKER = "\n...[TRUNCATED]...\n"
+
+
+@functools.lru_cache(maxsize=1)
+def _encoder():
+    """
+    tiktoken encoding of the validation model, or None if it cannot be loaded
+    
+    tiktoken downloads BPE files on first use; any load failure falls back
+    to the character estimate rather than failing the validation.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(VALIDATION_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def _truncate_output(output: str, max_tokens: int = MAX_OUTPUT_TOKENS) -> str:
+    """
+    Keep the first and last max_tokens/2 tokens of a long output
+    
+    Without tiktoken, tokens are estimated as 4 characters.
+    """
+    encoder = _encoder()
+    if encoder is None:
+        max_chars = max_tokens * 4
+        if len(output) <= max_chars:
+            return output
+        half = max_chars // 2
+        return output[:half] + _TRUNCATION_MARKER + output[-half:]
+    
+    ids = encoder.encode(output)
+    if len(ids) <= max_tokens:
+        return output
+    half = max_tokens // 2
+    return encoder.decode(ids[:half]) + _TRUNCATION_MARKER + encoder.decode(ids[-half:])
+
+
+def _criteria_block(criteria: Dict[str, int]) -> str:
+    """Criteria weights as the bullet list shown to the validator"""
+    return '\n'.join(f"- {criterion.capitalize()}: {weight}%" for criterion, weight in criteria.items())
+
+
+# Only task, output and criteria vary between validations
+_VALIDATION_PROMPT = """
+You are a quality validator. Rate the following output on a scale of 0-100.
+
+TASK:
+{task}
+
+OUTPUT:
+{output}
+
+CRITERIA:
+{criteria}
+
+Record your rating with the score function.
+
+Be strict but fair. A score of 80+ means production-ready quality.
+"""
 
 class Guardian:
     """Quality validation using OpenAI"""
     
+    # Validation results kept for repeated (output, task, criteria)
+    CACHE_MAXSIZE = 1024
+    
+    # One OpenAI client, and so one connection pool, for all instances
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    _shared_client: Optional[OpenAI] = None
+    
+    DEFAULT_CRITERIA = {
+        'accuracy': 40,
+        'completeness': 30,
+        'clarity': 20,
+        'relevance': 10
+    }
+    _DEFAULT_CRITERIA_BLOCK = _criteria_block(DEFAULT_CRITERIA)
+    
     def __init__(self):
-        self.client = OpenAI()
+        # Fail fast like OpenAI() did: without a key every validation would
+        # error and fail open, approving everything
+        if not os.environ.get("OPENAI_API_KEY"):
+            raise OpenAIError("Missing credentials: set the OPENAI_API_KEY environment variable")
+        self._client: Optional[OpenAI] = None  # per-instance override
+        self._aclient = None
         self.quality_threshold = 80  # Minimum acceptable quality
+        
+        # blake2b(output, task, criteria) -> validation result, LRU order
+        self._cache: "OrderedDict[bytes, Dict]" = OrderedDict()
     
     def validate(
         self,
@@ -36,94 +180,195 @@ class Guardian:
         
         Returns:
             Dict with 'score', 'passed', 'feedback', 'breakdown'
+            (repeated validations are answered from cache at no cost)
         """
         if criteria is None:
-            criteria = {
-                'accuracy': 40,
-                'completeness': 30,
-                'clarity': 20,
-                'relevance': 10
-            }
+            criteria = self.DEFAULT_CRITERIA
         
-        # Build validation prompt
-        validation_prompt = f"""
-You are a quality validator. Rate the following output on a scale of 0-100.
-
-TASK:
-{task}
-
-OUTPUT:
-{output}
-
-CRITERIA:
-{self._format_criteria(criteria)}
-
-Provide your rating in this exact JSON format:
-{{
-    "overall_score": <number 0-100>,
-    "accuracy": <number 0-100>,
-    "completeness": <number 0-100>,
-    "clarity": <number 0-100>,
-    "relevance": <number 0-100>,
-    "feedback": "<brief explanation of the score>",
-    "improvements": "<suggestions for improvement if score < 80>"
-}}
-
-Be strict but fair. A score of 80+ means production-ready quality.
-"""
+        key = self._cache_key(output, task, criteria)
+        cached = self._cached_validation(key)
+        if cached is not None:
+            return cached
         
         try:
             # Call OpenAI for validation
             response = self.client.chat.completions.create(
-                model="gpt-4-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a strict quality validator."},
-                    {"role": "user", "content": validation_prompt}
-                ],
-                temperature=0.3,  # Low temperature for consistent scoring
-                response_format={"type": "json_object"}
+                **self._validation_request(output, task, criteria)
             )
-            
-            # Parse response
-            import json
-            result = json.loads(response.choices[0].message.content)
-            
-            score = result.get('overall_score', 0)
-            passed = score >= self.quality_threshold
-            
-            return {
-                'score': score,
-                'passed': passed,
-                'feedback': result.get('feedback', ''),
-                'improvements': result.get('improvements', ''),
-                'breakdown': {
-                    'accuracy': result.get('accuracy', 0),
-                    'completeness': result.get('completeness', 0),
-                    'clarity': result.get('clarity', 0),
-                    'relevance': result.get('relevance', 0)
-                },
-                'cost': 0.01  # Approximate cost of validation
-            }
-            
+            return self._validation_result(key, self._score_arguments(response))
         except Exception as e:
-            # If validation fails, assume quality is acceptable
-            # (fail-open to avoid blocking legitimate work)
-            return {
-                'score': 80,
-                'passed': True,
-                'feedback': f'Validation error: {e}. Assuming acceptable quality.',
-                'improvements': '',
-                'breakdown': {},
-                'cost': 0,
-                'error': str(e)
-            }
+            return self._validation_error(e)
+    
+    async def validate_async(
+        self,
+        output: str,
+        task: str,
+        criteria: Optional[Dict[str, int]] = None
+    ) -> Dict:
+        """
+        Validate output quality without blocking the event loop
+        
+        Same arguments and result as validate(), using the async client.
+        """
+        if criteria is None:
+            criteria = self.DEFAULT_CRITERIA
+        
+        key = self._cache_key(output, task, criteria)
+        cached = self._cached_validation(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self.aclient.chat.completions.create(
+                **self._validation_request(output, task, criteria)
+            )
+            return self._validation_result(key, self._score_arguments(response))
+        except Exception as e:
+            return self._validation_error(e)
+    
+    def validate_batch(self, items: List[Dict]) -> List[Dict]:
+        """
+        Validate several outputs concurrently
+        
+        Wall time is that of the slowest validation rather than the sum.
+        Must not be called from a running event loop (await
+        validate_async() there instead).
+        
+        Args:
+            items: Dicts of validate() keyword arguments ('output', 'task',
+                optionally 'criteria')
+        
+        Returns:
+            Validation results, in the order of items
+        """
+        async def run():
+            try:
+                return await asyncio.gather(*(self.validate_async(**item) for item in items))
+            finally:
+                # The async client's connections belong to this event loop
+                if self._aclient is not None:
+                    await self._aclient.close()
+                    self._aclient = None
+        
+        return list(asyncio.run(run()))
+    
+    def _cached_validation(self, key: bytes) -> Optional[Dict]:
+        """Cached result for a validation request (cost-free), if any"""
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        self._cache.move_to_end(key)
+        return dict(cached, breakdown=dict(cached['breakdown']),
+                    passed=cached['score'] >= self.quality_threshold, cost=0, cached=True)
+    
+    def _validation_request(self, output: str, task: str, criteria: Dict[str, int]) -> Dict:
+        """Keyword arguments for the chat completion that scores output"""
+        validation_prompt = _VALIDATION_PROMPT.format(
+            task=task,
+            output=_truncate_output(output),
+            criteria=self._format_criteria(criteria)
+        )
+        
+        return {
+            'model': VALIDATION_MODEL,
+            'messages': [
+                {"role": "system", "content": "You are a strict quality validator."},
+                {"role": "user", "content": validation_prompt}
+            ],
+            'temperature': 0.3,  # Low temperature for consistent scoring
+            'tools': [_SCORE_TOOL],
+            'tool_choice': _SCORE_TOOL_CHOICE
+        }
+    
+    @staticmethod
+    def _score_arguments(response) -> str:
+        """JSON arguments of the score function call in a completion"""
+        return response.choices[0].message.tool_calls[0].function.arguments
+    
+    def _validation_result(self, key: bytes, content: str) -> Dict:
+        """Parse the validator's score arguments into a result and cache it"""
+        result = _loads(content)
+        
+        score = result.get('overall_score', 0)
+        passed = score >= self.quality_threshold
+        
+        validation = {
+            'score': score,
+            'passed': passed,
+            'feedback': result.get('feedback', ''),
+            'improvements': result.get('improvements', ''),
+            'breakdown': {
+                'accuracy': result.get('accuracy', 0),
+                'completeness': result.get('completeness', 0),
+                'clarity': result.get('clarity', 0),
+                'relevance': result.get('relevance', 0)
+            },
+            'cost': 0.01  # Approximate cost of validation
+        }
+        
+        # Only real scores are cached, never the fail-open fallback
+        self._cache[key] = dict(validation, breakdown=dict(validation['breakdown']))
+        if len(self._cache) > self.CACHE_MAXSIZE:
+            self._cache.popitem(last=False)
+        
+        return validation
+    
+    @staticmethod
+    def _validation_error(e: Exception) -> Dict:
+        """Result used when validation itself fails"""
+        # If validation fails, assume quality is acceptable
+        # (fail-open to avoid blocking legitimate work)
+        return {
+            'score': 80,
+            'passed': True,
+            'feedback': f'Validation error: {e}. Assuming acceptable quality.',
+            'improvements': '',
+            'breakdown': {},
+            'cost': 0,
+            'error': str(e)
+        }
+    
+    @classmethod
+    def _get_client(cls) -> OpenAI:
+        """Shared OpenAI client, created on first use"""
+        if cls._shared_client is None:
+            http_client = DefaultHttpxClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=cls.MAX_KEEPALIVE_CONNECTIONS)
+            )
+            cls._shared_client = OpenAI(http_client=http_client)
+        return cls._shared_client
+    
+    @property
+    def client(self) -> OpenAI:
+        """OpenAI client: the shared one unless this instance was given its own"""
+        if self._client is None:
+            return self._get_client()
+        return self._client
+    
+    @client.setter
+    def client(self, value: OpenAI):
+        self._client = value
+    
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """Async OpenAI client, created on first async validation"""
+        if self._aclient is None:
+            self._aclient = AsyncOpenAI()
+        return self._aclient
+    
+    @staticmethod
+    def _cache_key(output: str, task: str, criteria: Dict[str, int]) -> bytes:
+        """Digest identifying a validation request"""
+        payload = '\x00'.join((output, task, json.dumps(criteria, sort_keys=True)))
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
     
     def _format_criteria(self, criteria: Dict[str, int]) -> str:
         """Format criteria for the prompt"""
-        lines = []
-        for criterion, weight in criteria.items():
-            lines.append(f"- {criterion.capitalize()}: {weight}%")
-        return '\n'.join(lines)
+        # validate() passes DEFAULT_CRITERIA itself when none are given
+        if criteria is self.DEFAULT_CRITERIA:
+            return self._DEFAULT_CRITERIA_BLOCK
+        return _criteria_block(criteria)
     
     def validate_and_improve(
         self,
@@ -144,6 +389,7 @@ Be strict but fair. A score of 80+ means production-ready quality.
         """
         current_output = output
         total_cost = 0
+        validation = None
         
         for iteration in range(max_iterations):
             # Validate current output
@@ -181,7 +427,7 @@ Please provide an improved version that addresses the feedback.
                 
                 try:
                     response = self.client.chat.completions.create(
-                        model="gpt-4-turbo",
+                        model=IMPROVEMENT_MODEL,
                         messages=[
                             {"role": "system", "content": "You are an expert at improving content quality."},
                             {"role": "user", "content": improvement_prompt}
@@ -196,9 +442,13 @@ Please provide an improved version that addresses the feedback.
                     # If improvement fails, return current output
                     break
         
-        # Return final output even if below threshold
-        final_validation = self.validate(current_output, task)
-        total_cost += final_validation['cost']
+        # Return final output even if below threshold. The loop always ends
+        # on a validation of current_output, so its result is reused
+        # rather than paying for another round trip.
+        final_validation = validation
+        if final_validation is None:
+            final_validation = self.validate(current_output, task)
+            total_cost += final_validation['cost']
         
         return {
             'output': current_output,
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Manus Lazy Loader: Deferred Enforcement Activation
+
+Installed from the auto-enforcer's .pth file in place of calling
+activate_enforcement() directly. A sys.meta_path finder waits for the
+first import of a Manus module (anything under this core/ directory)
+and only then activates enforcement, so Python processes that never
+touch the knowledge system pay nothing at startup.
+
+This module must stay cheap to import: it runs on every interpreter start.
+
+Author: Manus Global Knowledge System v2.0
+"""
+
+import os
+import sys
+
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Finder:
+    """
+    Meta path finder that activates enforcement on the first Manus import.
+
+    Never loads anything itself: find_spec always returns None so the
+    regular finders import the module as usual, even if activation fails.
+    """
+
+    _manus_lazy_finder = True
+
+    def __init__(self):
+        self.activated = False
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self.activated or path is None or CORE_DIR not in path:
+            return None
+
+        # Flip first and step aside: activation itself imports Manus modules,
+        # and must not re-enter this hook
+        self.activated = True
+        uninstall()
+
+        # This hook runs inside someone else's import statement; a failed
+        # activation is logged, never raised into that import
+        try:
+            from core.auto_enforcer import activate_enforcement
+            activate_enforcement()
+        except Exception:
+            import logging
+            logging.getLogger(__name__).exception("Manus enforcement activation failed")
+        return None
+
+
+def install():
+    """Add the finder to sys.meta_path, once, even if the .pth runs twice."""
+    if any(getattr(finder, '_manus_lazy_finder', False) for finder in sys.meta_path):
+        return
+    sys.meta_path.insert(0, Finder())
+
+
+def uninstall():
+    """Remove any installed finder from sys.meta_path."""
+    sys.meta_path[:] = [
+        finder for finder in sys.meta_path
+        if not getattr(finder, '_manus_lazy_finder', False)
+    ]
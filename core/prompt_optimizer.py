@@ -14,6 +14,30 @@ from pathlib import Path
 from datetime import datetime
 
 
+# Compression patterns, compiled once. Each list of alternatives is a single
+# regex so a prompt is scanned once per stage rather than once per pattern.
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_FILLER_RE = re.compile(
+    r'\b(?:please|kindly|just|simply|actually|basically|literally)\b'
+    r'|\b(?:I think|I believe|in my opinion|it seems)\b'
+    r'|\b(?:very|really|quite|somewhat|rather)\b',
+    re.IGNORECASE
+)
+
+_REDUNDANT_PHRASES = {
+    'in order to': 'to',
+    'due to the fact that': 'because',
+    'at this point in time': 'now',
+    'for the purpose of': 'for',
+    'in the event that': 'if'
+}
+_REDUNDANT_RE = re.compile(
+    '|'.join(re.escape(phrase) for phrase in _REDUNDANT_PHRASES),
+    re.IGNORECASE
+)
+
+
 class PromptOptimizer:
     """Optimizes prompts to reduce token usage while maintaining quality"""
     
@@ -57,33 +81,21 @@ class PromptOptimizer:
         compressed = prompt_text
         
         # Remove extra whitespace
-        compressed = re.sub(r'\s+', ' ', compressed)
+        compressed = _WHITESPACE_RE.sub(' ', compressed)
         compressed = compressed.strip()
         
         # Remove filler words (if compression level is medium or high)
         if self.rules['compression_level'] in ['medium', 'high']:
-            fillers = [
-                r'\b(please|kindly|just|simply|actually|basically|literally)\b',
-                r'\b(I think|I believe|in my opinion|it seems)\b',
-                r'\b(very|really|quite|somewhat|rather)\b'
-            ]
-            for filler_pattern in fillers:
-                compressed = re.sub(filler_pattern, '', compressed, flags=re.IGNORECASE)
+            compressed = _FILLER_RE.sub('', compressed)
         
         # Remove redundant phrases (if compression level is high)
         if self.rules['compression_level'] == 'high':
-            redundant = [
-                (r'in order to', 'to'),
-                (r'due to the fact that', 'because'),
-                (r'at this point in time', 'now'),
-                (r'for the purpose of', 'for'),
-                (r'in the event that', 'if')
-            ]
-            for old, new in redundant:
-                compressed = re.sub(old, new, compressed, flags=re.IGNORECASE)
+            compressed = _REDUNDANT_RE.sub(
+                lambda m: _REDUNDANT_PHRASES[m.group(0).lower()], compressed
+            )
         
         # Clean up extra spaces again
-        compressed = re.sub(r'\s+', ' ', compressed).strip()
+        compressed = _WHITESPACE_RE.sub(' ', compressed).strip()
         
         return compressed
     
@@ -170,25 +182,31 @@ class PromptOptimizer:
         """
         Optimize prompt data structure (for API calls)
         
+        The input is never mutated, but it is not deep-copied either: the
+        result is a new dict with a new messages list, and a message is
+        cloned only when its content is rewritten. Untouched messages are
+        shared with the input, so callers should clone and replace a message
+        rather than edit it in place.
+        
         Args:
             prompt_data: Dict with 'messages' or 'prompt' key
             
         Returns:
             Optimized prompt data
         """
-        import copy
-        optimized = copy.deepcopy(prompt_data)
+        optimized = dict(prompt_data)
         
         # Handle messages format (chat)
         if 'messages' in optimized:
-            messages = optimized['messages']
+            messages = []
             
             # Compress each message
-            for message in messages:
+            for message in optimized['messages']:
                 if 'content' in message:
-                    original = message['content']
-                    compressed = self.compress_prompt(original)
-                    message['content'] = compressed
+                    compressed = self.compress_prompt(message['content'])
+                    message = {**message, 'content': compressed}
+                messages.append(message)
+            optimized['messages'] = messages
             
             # Summarize history if too long (more than 10 messages)
             if len(messages) > 10:
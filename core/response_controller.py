@@ -8,7 +8,7 @@ Quality: Maintain essential information
 """
 
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -57,6 +57,15 @@ class ResponseController:
             self.rules['default_max_tokens']
         )
     
+    def get_max_tokens_table(self) -> Tuple[Dict[str, int], int]:
+        """
+        Get the max_tokens limits for all request types at once
+        
+        Returns:
+            (limits by request type, limit for any other request type)
+        """
+        return dict(self.rules['max_tokens_by_type']), self.rules['default_max_tokens']
+    
     def enforce_max_tokens(self, api_params: Dict[str, Any], request_type: str = 'default') -> Dict[str, Any]:
         """
         Add or modify max_tokens parameter in API request
@@ -102,17 +111,18 @@ class ResponseController:
         if len(response_text) <= threshold_length:
             return response_text
         
-        # Truncate at sentence boundary if possible
-        truncated = response_text[:max_length]
-        
-        # Find last sentence boundary
-        last_period = truncated.rfind('.')
-        last_newline = truncated.rfind('\n')
+        # Find last sentence boundary within the limit (searched in place,
+        # so the text is sliced only once)
+        last_period = response_text.rfind('.', 0, max_length)
+        last_newline = response_text.rfind('\n', 0, max_length)
         
         boundary = max(last_period, last_newline)
         
+        # Truncate at sentence boundary if possible
         if boundary > max_length * 0.8:  # Only truncate at boundary if it's not too far back
-            truncated = truncated[:boundary + 1]
+            truncated = response_text[:boundary + 1]
+        else:
+            truncated = response_text[:max_length]
         
         # Add ellipsis if truncated
         if len(truncated) < len(response_text):
@@ -167,16 +177,21 @@ class ResponseController:
         max_tokens = self.get_max_tokens(request_type)
         max_length = max_tokens * 4  # Approximate chars
         
-        # Handle OpenAI chat completion format
+        # Handle OpenAI chat completion format (choices are cloned, not
+        # edited in place, so the caller's response is left untouched).
+        # Tool-call messages have content None and are passed through.
         if 'choices' in processed:
+            choices = []
             for choice in processed['choices']:
-                if 'message' in choice and 'content' in choice['message']:
+                if 'message' in choice and isinstance(choice['message'].get('content'), str):
                     original = choice['message']['content']
                     truncated = self.truncate_response(original, max_length)
-                    choice['message']['content'] = truncated
+                    choice = {**choice, 'message': {**choice['message'], 'content': truncated}}
+                choices.append(choice)
+            processed['choices'] = choices
         
         # Handle simple text response
-        elif 'text' in processed:
+        elif isinstance(processed.get('text'), str):
             original = processed['text']
             truncated = self.truncate_response(original, max_length)
             processed['text'] = truncated
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for AggressiveCostOptimizer's response cache
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from aggressive_cost_optimizer import AggressiveCostOptimizer
+
+
+def test_cache_sees_entries_saved_by_another_instance(tmp_path):
+    reader = AggressiveCostOptimizer(tmp_path)
+    writer = AggressiveCostOptimizer(tmp_path)
+    assert reader.check_cache("prompt") == (False, None, "Cache miss")
+
+    writer.save_cache("prompt", "response")
+
+    hit, data, _ = reader.check_cache("prompt")
+    assert hit and data == "response"
+
+
+def test_flat_cache_files_are_moved_into_shards(tmp_path):
+    old = AggressiveCostOptimizer(tmp_path)
+    old.save_cache("prompt", "response")
+    cache_key = old._cache_key("prompt")
+    old._cache_file(cache_key).rename(old.cache_dir / f"{cache_key}.json")
+
+    optimizer = AggressiveCostOptimizer(tmp_path)
+    hit, data, _ = optimizer.check_cache("prompt")
+    assert hit and data == "response"
+    assert not (optimizer.cache_dir / f"{cache_key}.json").exists()
+    assert optimizer._count_cache_entries() == 1
+
+
+def test_cache_count_includes_new_entries_without_recounting(tmp_path, monkeypatch):
+    optimizer = AggressiveCostOptimizer(tmp_path)
+    optimizer.save_cache("first", "response")
+    assert optimizer._count_cache_entries() == 1
+
+    monkeypatch.setattr("os.scandir", None)  # a recount would fail
+    optimizer.save_cache("second", "response")
+    optimizer.save_cache("second", "updated")
+    assert optimizer._count_cache_entries() == 2
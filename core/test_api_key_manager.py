@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for APIKeyManager's encrypted secrets file
+"""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+from cryptography.fernet import Fernet
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import api_key_manager
+from api_key_manager import APIKeyManager
+
+KEYS = {'OPENAI_API_KEY': 'sk-test', 'APOLLO_API_KEY': 'apollo-test'}
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(api_key_manager, '_secure_keyring', lambda: None)
+    monkeypatch.setattr(APIKeyManager, 'BINARY_FORMAT', True)
+    return APIKeyManager()
+
+
+def test_binary_format_round_trip(manager):
+    assert manager.save_keys(KEYS)[0]
+
+    blob = manager.secrets_file.read_bytes()
+    assert blob.startswith(APIKeyManager.BINARY_MAGIC + bytes([APIKeyManager.BINARY_VERSION]))
+    assert b'sk-test' not in blob
+    assert manager.load_keys()[:2] == (True, KEYS)
+
+
+def test_fernet_files_stay_readable(manager, monkeypatch):
+    monkeypatch.setattr(APIKeyManager, 'BINARY_FORMAT', False)
+    assert manager.save_keys(KEYS)[0]
+    assert not manager.secrets_file.read_bytes().startswith(APIKeyManager.BINARY_MAGIC)
+
+    monkeypatch.setattr(APIKeyManager, 'BINARY_FORMAT', True)
+    assert manager.load_keys()[:2] == (True, KEYS)
+
+
+@pytest.mark.parametrize('offset', [4, 5, 30, -1])
+def test_tampered_file_is_rejected(manager, offset):
+    assert manager.save_keys(KEYS)[0]
+    blob = bytearray(manager.secrets_file.read_bytes())
+    blob[offset] ^= 1
+    manager.secrets_file.write_bytes(bytes(blob))
+
+    success, keys, msg = manager.load_keys()
+    assert not success and keys == {}
+    assert 'integrity check' in msg or 'format version' in msg
+
+
+def test_wrong_key_is_rejected(manager):
+    assert manager.save_keys(KEYS)[0]
+
+    other = APIKeyManager()
+    other.encryption_key = Fernet.generate_key()
+    success, keys, msg = other.load_keys()
+    assert not success and keys == {}
+    assert 'integrity check' in msg
+
+
+def test_bulk_update_merges_into_saved_keys(manager):
+    assert manager.bulk_update({'OPENAI_API_KEY': 'sk-old'})[0]
+    assert manager.bulk_update({'OPENAI_API_KEY': 'sk-test', 'APOLLO_API_KEY': 'apollo-test'})[0]
+
+    assert manager.load_keys()[:2] == (True, KEYS)
+
+
+def test_atomic_write_keeps_old_file_on_failure(manager, monkeypatch):
+    assert manager.save_keys(KEYS)[0]
+    saved = manager.secrets_file.read_bytes()
+    assert stat.S_IMODE(manager.secrets_file.stat().st_mode) == 0o600
+
+    def fail(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    success, msg = manager.save_keys({'OPENAI_API_KEY': 'sk-new'})
+    assert not success and 'disk full' in msg
+    assert manager.secrets_file.read_bytes() == saved
+    assert list(manager.secrets_file.parent.glob('*.tmp')) == []
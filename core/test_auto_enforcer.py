@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for loading the enforcement pipeline from BASE_PATH
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import auto_enforcer
+
+
+def test_pipeline_module_loads_without_core_on_sys_path(tmp_path, monkeypatch):
+    core = tmp_path / "core"
+    core.mkdir()
+    (core / "openai_helper.py").write_text("openai_helper = 'helper from BASE_PATH'\n")
+    (core / "unified_enforcement.py").write_text(
+        "from core.openai_helper import openai_helper\n"
+        "try:\n"
+        "    from core.system_integration import SystemBus\n"
+        "except Exception:\n"
+        "    SystemBus = None\n"
+    )
+    monkeypatch.setattr(auto_enforcer, "BASE_PATH", tmp_path)
+    monkeypatch.setattr(sys, "path", [p for p in sys.path if p not in ("", ".", str(Path.cwd()))])
+    monkeypatch.setattr(sys, "modules", {
+        name: module for name, module in sys.modules.items()
+        if name != "core" and not name.startswith("core.")
+    })
+
+    module = auto_enforcer._load_unified_enforcement()
+
+    assert module.openai_helper == "helper from BASE_PATH"
+    assert module.SystemBus is None
+    assert "core.system_integration" not in sys.modules
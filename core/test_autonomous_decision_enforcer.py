@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for AutonomousDecisionEnforcer
+Checks that message casing does not change the verdict
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from autonomous_decision_enforcer import AutonomousDecisionEnforcer, _compile
+
+
+MESSAGES = [
+    "Which do you prefer: Option A or Option B?",
+    "Should I use PostgreSQL or MongoDB?",
+    "Would you like me to continue?",
+    "Let me know which you want.",
+    "Which brand color do you prefer?",
+    "Please provide the URL for the dataset.",
+    "I've implemented the solution using Python and FastAPI.",
+    "Pick one and I'll get started.",
+]
+
+
+def test_mixed_case_matches_lowercase():
+    """Verdicts and itemised matches are identical whatever the casing."""
+    enforcer = AutonomousDecisionEnforcer()
+    
+    for message in MESSAGES:
+        expected = enforcer.check_message(message.lower())
+        for variant in (message, message.upper(), message.swapcase()):
+            assert enforcer.check_message(variant) == expected, variant
+
+
+def test_mixed_case_violation_detected():
+    """Mixed-case violations are still caught and itemised."""
+    enforcer = AutonomousDecisionEnforcer()
+    
+    is_violation, _, violations = enforcer.check_message("WhIcH OpTiOn Do YoU wAnT?")
+    assert is_violation
+    assert violations == ["Pattern: which\\s+(option|approach|method|solution) | Match: option"]
+    
+    is_violation, reason, _ = enforcer.check_message("Which BRAND Colour do you prefer?")
+    assert not is_violation
+    assert reason.startswith("Exception")
+
+
+def test_check_messages_matches_check_message():
+    """Batch results line up with checking each message on its own."""
+    enforcer = AutonomousDecisionEnforcer()
+    
+    # Adjacent messages must not combine into a match across the boundary
+    messages = MESSAGES + ["Option A is done", "or maybe option B", "which", "option is best", ""]
+    expected = [enforcer.check_message(message) for message in messages]
+    
+    batch = AutonomousDecisionEnforcer()
+    assert batch.check_messages(messages) == expected
+    assert batch.get_stats() == enforcer.get_stats()
+    assert batch.check_messages([]) == []
+
+
+def test_rules_report_first_findall_match():
+    """Each rule itemises the same match re.findall reported per pattern."""
+    enforcer = AutonomousDecisionEnforcer()
+    messages = MESSAGES + [
+        "Which  do you   like, option A or option B?",
+        "Tell me what you think; should I do it?",
+    ]
+    
+    for message in messages:
+        lowered = message.lower()
+        expected = [
+            f"Pattern: {pattern} | Match: {re.findall(pattern, lowered, re.IGNORECASE)[0]}"
+            for pattern in AutonomousDecisionEnforcer.VIOLATION_PATTERNS
+            if re.findall(pattern, lowered, re.IGNORECASE)
+        ]
+        _, _, violations = enforcer.check_message(message)
+        if not enforcer._EXCEPTION_RE.search(message):
+            assert list(violations) == expected, message
+
+
+def test_whitespace_matches_stdlib_re():
+    """Whatever the engine, \\s matches every character str.isspace() accepts."""
+    spaces = [chr(c) for c in range(0x3001) if chr(c).isspace()]
+    compiled = _compile(r"should\s+i")
+    for space in spaces:
+        assert compiled.search(f"Should{space}I"), hex(ord(space))
+    assert not compiled.search("Should\u200bI")  # zero-width space is not whitespace
+    
+    enforcer = AutonomousDecisionEnforcer()
+    is_violation, _, violations = enforcer.check_message("Should\u00a0I use Redis?")
+    assert is_violation
+    assert violations == ["Pattern: should\\s+I\\s+(use|implement|choose|do) | Match: use"]
+
+
+def test_shorthand_classes_match_stdlib_re():
+    """\\d and \\w match Unicode digits and letters, and \\b keeps its Unicode meaning."""
+    message = "Should I use the card for spending $\u0661\u0662\u0663\u0664?"
+    is_violation, reason, _ = AutonomousDecisionEnforcer().check_message(message)
+    assert not is_violation
+    assert reason.startswith("Exception")
+    
+    samples = ["\u0661\u0662", "\u0967", "x", "\u00e9t\u00e9", "t\u00e9", "_", "-", "\u0345", " ", "\u00a0"]
+    for pattern in (r"\d+", r"\D", r"\w+", r"\W", r"\bt\u00e9", r"[\d]"):
+        compiled = _compile(pattern)
+        for sample in samples:
+            assert bool(compiled.search(sample)) == bool(re.search(pattern, sample, re.IGNORECASE)), (pattern, sample)
+
+
+if __name__ == "__main__":
+    test_mixed_case_matches_lowercase()
+    test_mixed_case_violation_detected()
+    test_check_messages_matches_check_message()
+    test_rules_report_first_findall_match()
+    test_whitespace_matches_stdlib_re()
+    test_shorthand_classes_match_stdlib_re()
+    print("✅ AutonomousDecisionEnforcer tests passed")
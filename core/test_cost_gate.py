@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for CostGate's decision log and summary
+"""
+
+import gc
+import json
+import sys
+import weakref
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cost_gate
+from cost_gate import CostGate
+
+RULES = {"blocking": {"require_justification_above": True}, "thresholds": {"critical": 100}}
+
+
+def test_summary_adds_up_every_gate(tmp_path):
+    first = CostGate(RULES, tmp_path)
+    second = CostGate(RULES, tmp_path)
+    first.validate_action("research", "summarize a paper", "openai", 1)
+    first.validate_action("research", "crawl everything", "search", 500)
+    second.validate_action("research", "summarize a paper", "openai", 1)
+
+    cost_gate._flush_live_gates()
+    cost_gate._flush_live_gates()  # counts are only added once
+
+    summary = json.loads(first.summary_path.read_text())
+    assert summary == {"total_blocks": 1, "total_approvals": 2, "block_rate": 1 / 3}
+    assert first.get_statistics() == summary
+
+
+def test_exit_hook_does_not_keep_gates_alive(tmp_path):
+    gate = CostGate(RULES, tmp_path)
+    gate.validate_action("research", "summarize a paper", "openai", 1)
+    ref = weakref.ref(gate)
+
+    del gate
+    gc.collect()
+
+    assert ref() is None
+    summary = json.loads((tmp_path / "metrics" / "cost_gate_summary.json").read_text())
+    assert summary["total_approvals"] == 1
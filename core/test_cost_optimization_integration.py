@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for history ranking in CostOptimizationIntegration
+"""
+
+import copy
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cost_optimization_integration import (
+    CostOptimizationIntegration,
+    STUB_RETRIEVAL_TOOL,
+    _SimpleBM25,
+    get_optimizer,
+)
+
+
+def _conversation():
+    filler = 'The weather report mentions rain showers over the coastal region tomorrow. '
+    return {
+        'model': 'gpt-3.5-turbo',
+        'messages': [
+            {'role': 'system', 'content': 'You are a database assistant.'},
+            {'role': 'user', 'content': filler * 3},
+            {'role': 'assistant', 'content': filler * 3},
+            {'role': 'user', 'content': 'The postgres index on orders.customer_id is missing. ' * 3},
+            {'role': 'assistant', 'content': 'Create the postgres index on orders.customer_id concurrently. ' * 3},
+            {'role': 'user', 'content': filler * 3},
+            {'role': 'assistant', 'content': 'Noted, thanks.'},
+            {'role': 'user', 'content': 'Which postgres index should I add for orders.customer_id?'},
+        ]
+    }
+
+
+def test_rank_history_stubs_irrelevant_turns():
+    params = _conversation()
+    snapshot = copy.deepcopy(params)
+    integration = CostOptimizationIntegration(min_compression_chars=10 ** 9, rank_history=True)
+
+    optimized = integration.optimize_api_call(params)
+    messages = optimized['messages']
+
+    assert params == snapshot
+    # System, last user and last assistant message are protected
+    assert messages[0] == params['messages'][0]
+    assert messages[-1] == params['messages'][-1]
+    assert messages[-2] == params['messages'][-2]
+    # The postgres turns are kept; of the tied weather turns the older two
+    # are stubbed to reach the keep ratio (3 of 5)
+    assert messages[3] == params['messages'][3]
+    assert messages[4] == params['messages'][4]
+    assert messages[5] == params['messages'][5]
+    assert messages[1]['content'].startswith('[stubbed:')
+    assert messages[2]['content'].startswith('[stubbed:')
+    assert messages[1]['role'] == 'user'
+    assert STUB_RETRIEVAL_TOOL in optimized['tools']
+    assert integration.get_stats()['stubbed_messages'] == 2
+    assert integration.get_stats()['total_tokens_saved'] > 0
+
+    stub_id = messages[1]['content'][len('[stubbed:'):-1]
+    assert integration.retrieve_stubbed_content(stub_id) == params['messages'][1]['content']
+
+
+def test_short_conversation_is_not_ranked():
+    params = _conversation()
+    params['messages'] = params['messages'][:4]
+    integration = CostOptimizationIntegration(min_compression_chars=10 ** 9, rank_history=True)
+
+    optimized = integration.optimize_api_call(params)
+
+    assert optimized['messages'] == params['messages']
+    assert 'tools' not in optimized
+
+
+def test_history_ranking_is_opt_in():
+    params = _conversation()
+    optimized = CostOptimizationIntegration(min_compression_chars=10 ** 9).optimize_api_call(params)
+
+    assert optimized['messages'] == params['messages']
+    assert 'tools' not in optimized
+
+
+def test_legacy_functions_requests_are_not_ranked():
+    params = _conversation()
+    params['functions'] = [{'name': 'lookup', 'parameters': {'type': 'object', 'properties': {}}}]
+    integration = CostOptimizationIntegration(min_compression_chars=10 ** 9, rank_history=True)
+
+    optimized = integration.optimize_api_call(params)
+
+    assert optimized['messages'] == params['messages']
+    assert 'tools' not in optimized
+
+
+def test_tool_call_response_passes_through():
+    integration = CostOptimizationIntegration()
+    tool_call = {'id': 'call_1', 'type': 'function',
+                 'function': {'name': 'retrieve_stubbed_content', 'arguments': '{"stub_id": "1:ab"}'}}
+    response = {'choices': [{'message': {'role': 'assistant', 'content': None, 'tool_calls': [tool_call]}}]}
+
+    processed = integration.process_api_response(response)
+
+    assert processed['choices'][0]['message'] == response['choices'][0]['message']
+
+
+def test_simple_bm25_prefers_matching_document():
+    bm25 = _SimpleBM25([['rain', 'coast'], ['postgres', 'index'], []])
+    scores = bm25.get_scores(['postgres', 'index'])
+    assert scores[1] > scores[0] == scores[2] == 0
+
+
+def test_get_optimizer_is_a_resettable_singleton():
+    first = get_optimizer()
+    assert get_optimizer() is first
+    get_optimizer.cache_clear()
+    assert get_optimizer() is not first
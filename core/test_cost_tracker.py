@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for CostTracker log handling and Parquet rotation
+"""
+
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cost_tracker
+from cost_tracker import CostTracker
+
+
+class _TwoDaysAgo(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) - timedelta(days=2)
+
+
+def _entry(timestamp, cost=1.0, tool="openai"):
+    return {
+        "timestamp": timestamp.isoformat(),
+        "operation": "op",
+        "tool_used": tool,
+        "cost": cost,
+        "alternative_tool": None,
+        "alternative_cost": None,
+        "savings": 0,
+        "savings_percent": 0,
+        "reason": "",
+        "quality_score": 90,
+    }
+
+
+def _write_log(tracker, entries):
+    with open(tracker.operations_log, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def test_daily_summary_leaves_the_log_alone(tmp_path):
+    tracker = CostTracker(tmp_path)
+    now = datetime.now()
+    _write_log(tracker, [_entry(now - timedelta(days=2)), _entry(now - timedelta(seconds=5))])
+    before = tracker.operations_log.read_bytes()
+
+    summary = tracker.generate_daily_summary()
+
+    assert summary["total_operations"] == 1
+    assert tracker.operations_log.read_bytes() == before
+    assert not tracker.parquet_dir.exists()
+
+
+def test_appends_wait_for_the_rotation_lock(tmp_path):
+    tracker = CostTracker(tmp_path)
+    other = CostTracker(tmp_path)
+    other.log_operation("op", "openai", 0.001)
+
+    flushed = threading.Event()
+
+    def flush():
+        other._flush()
+        flushed.set()
+
+    with tracker._log_lock(exclusive=True):
+        thread = threading.Thread(target=flush)
+        thread.start()
+        assert not flushed.wait(0.2)
+        assert not tracker.operations_log.exists()
+
+    thread.join(5)
+    assert flushed.is_set()
+    assert len(tracker.operations_log.read_bytes().splitlines()) == 1
+
+
+def _log_stale_entry_between_recent_ones(tracker, monkeypatch):
+    """Log [recent, recent, two days old, recent], as a stalled process would"""
+    stalled = CostTracker(tracker.base_path)
+    monkeypatch.setattr(cost_tracker, "datetime", _TwoDaysAgo)
+    stalled.log_operation("stale", "search", 20)
+    monkeypatch.setattr(cost_tracker, "datetime", datetime)
+
+    tracker.log_operation("op", "openai", 0.001)
+    tracker.log_operation("op", "openai", 0.001)
+    tracker._flush()
+    stalled._flush()
+    tracker.log_operation("op", "openai", 0.001)
+    tracker._flush()
+
+
+def test_stats_count_lines_behind_a_stale_flush(tmp_path, monkeypatch):
+    tracker = CostTracker(tmp_path)
+    _log_stale_entry_between_recent_ones(tracker, monkeypatch)
+
+    assert tracker.unordered_marker.exists()
+    assert tracker.get_stats(days=1)["total_operations"] == 3
+    assert tracker.get_stats(days=3)["total_operations"] == 4
+
+
+def test_lines_flushed_within_the_slack_keep_the_log_searchable(tmp_path):
+    tracker = CostTracker(tmp_path)
+    other = CostTracker(tmp_path)
+    other.log_operation("op", "openai", 0.001)
+    tracker.log_operation("op", "openai", 0.001)
+    tracker._flush()
+    other._flush()
+
+    assert not tracker.unordered_marker.exists()
+    assert tracker.get_stats(days=1)["total_operations"] == 2
+
+
+def test_rotation_moves_past_days_to_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    tracker = CostTracker(tmp_path)
+    now = datetime.now()
+    old = [_entry(now - timedelta(days=2), cost=2.0, tool="search"),
+           _entry(now - timedelta(days=1, hours=1), cost=3.0)]
+    recent = [_entry(now - timedelta(seconds=5), cost=0.5)]
+    _write_log(tracker, old + recent)
+    expected = tracker.get_stats(days=3)
+
+    assert tracker.rotate_to_parquet() == 2
+
+    lines = tracker.operations_log.read_bytes().splitlines()
+    assert [json.loads(line) for line in lines] == recent
+    assert len(list(tracker.parquet_dir.glob("date=*/part-*.parquet"))) == 2
+    assert CostTracker(tmp_path).get_stats(days=3) == expected
+    assert tracker.get_stats(days=1)["total_operations"] == 1
+    assert tracker.rotate_to_parquet() == 0
+
+
+def test_buffered_entries_are_flushed_after_the_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(CostTracker, "FLUSH_INTERVAL", 0.05)
+    tracker = CostTracker(tmp_path)
+    tracker.log_operation("op", "openai", 0.001)
+    assert not tracker.operations_log.exists()
+
+    deadline = time.monotonic() + 5
+    while not tracker.operations_log.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(tracker.operations_log.read_bytes().splitlines()) == 1
+    assert tracker._flush_timer is None
+
+
+def test_rotation_sorts_an_unordered_log(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    tracker = CostTracker(tmp_path)
+    _log_stale_entry_between_recent_ones(tracker, monkeypatch)
+
+    assert tracker.rotate_to_parquet() == 1
+    assert not tracker.unordered_marker.exists()
+    lines = tracker.operations_log.read_bytes().splitlines()
+    timestamps = [json.loads(line)["timestamp"] for line in lines]
+    assert len(timestamps) == 3 and timestamps == sorted(timestamps)
+    assert tracker.get_stats(days=3)["total_operations"] == 4
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Tests for FeedbackLoopSystem's running statistics
+"""
+
+import gc
+import json
+import statistics
+import sys
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import feedback_loop_system
+from feedback_loop_system import ContinuousLearningEngine, FeedbackLoopSystem
+
+RATINGS = [5, 4, 5, 3, 4, 1, 2, 5, 5, 4, 3, 3, 5, 2]
+
+
+def _collect(system, ratings):
+    for i, rating in enumerate(ratings):
+        assert system.collect_feedback({"task_id": f"task_{i:03d}", "rating": rating})
+
+
+def test_analysis_matches_full_recomputation(tmp_path):
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS)
+
+    analysis = system.get_analysis()
+    assert analysis["total_feedback"] == len(RATINGS)
+    assert analysis["average_rating"] == statistics.mean(RATINGS)
+    assert analysis["median_rating"] == statistics.median(RATINGS)
+    assert analysis["rating_distribution"]["5_star"] == RATINGS.count(5)
+    assert analysis["trend"]["recent_average"] == statistics.mean(RATINGS[-10:])
+    assert analysis["trend"]["older_average"] == statistics.mean(RATINGS[:-10])
+
+
+def test_median_keeps_the_rating_type(tmp_path):
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS[:13])
+
+    median = system.get_analysis()["median_rating"]
+    assert median == statistics.median(RATINGS[:13])
+    assert type(median) is int
+
+
+def test_state_is_seeded_from_existing_log(tmp_path):
+    first = FeedbackLoopSystem(str(tmp_path))
+    _collect(first, RATINGS[:7])
+    first.close()
+
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS[7:])
+
+    assert system.get_analysis()["total_feedback"] == len(RATINGS)
+    assert system.get_analysis()["median_rating"] == statistics.median(RATINGS)
+
+
+def test_trend_needs_older_feedback(tmp_path):
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS[:10])
+
+    assert "trend" not in system.get_analysis()
+
+
+def test_analysis_writes_are_debounced(tmp_path):
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS[:5])
+    written = system.analysis_file.read_text()
+
+    _collect(system, [1, 1])
+    assert system.analysis_file.read_text() == written
+
+    system.flush()
+    assert system.analysis_file.read_text() != written
+    assert system.get_analysis()["total_feedback"] == 7
+
+
+def test_recent_feedback_reads_the_tail(tmp_path):
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS)
+
+    recent = system.get_recent_feedback(3)
+    assert [entry["task_id"] for entry in recent] == ["task_011", "task_012", "task_013"]
+    assert len(system.get_recent_feedback(100)) == len(RATINGS)
+
+
+def test_ratings_index_is_built_for_existing_log(tmp_path):
+    first = FeedbackLoopSystem(str(tmp_path))
+    _collect(first, RATINGS[:7])
+    first.close()
+    first.ratings_file.unlink()
+
+    system = FeedbackLoopSystem(str(tmp_path))
+    assert system.ratings_file.stat().st_size == 7 * 16
+    _collect(system, RATINGS[7:])
+    system.close()
+
+    reloaded = FeedbackLoopSystem(str(tmp_path))
+    reloaded._seed_state()
+    assert list(reloaded._state['sorted']) == sorted(RATINGS)
+
+
+def test_startup_reads_only_unindexed_lines(tmp_path):
+    first = FeedbackLoopSystem(str(tmp_path))
+    _collect(first, RATINGS[:7])
+    first.close()
+    # Indexed lines are not parsed again, so damaging one goes unnoticed
+    log = first.feedback_file.read_bytes()
+    first.feedback_file.write_bytes(b"#" + log[1:])
+    with open(first.feedback_file, "ab") as f:
+        f.write(json.dumps({"task_id": "task_007", "rating": RATINGS[7]}).encode() + b"\n")
+
+    system = FeedbackLoopSystem(str(tmp_path))
+    system._seed_state()
+    assert list(system._state['sorted']) == sorted(RATINGS[:8])
+
+
+def test_systems_sharing_a_log_index_it_consistently(tmp_path):
+    first = FeedbackLoopSystem(str(tmp_path))
+    second = FeedbackLoopSystem(str(tmp_path))
+    _collect(first, RATINGS[:1])
+    _collect(second, RATINGS[1:3])
+    _collect(first, RATINGS[3:4])
+    first.close()
+    second.close()
+
+    system = FeedbackLoopSystem(str(tmp_path))
+    system._seed_state()
+    assert list(system._state['sorted']) == sorted(RATINGS[:4])
+    assert system.ratings_file.stat().st_size == 4 * 16
+
+
+def test_index_out_of_step_with_the_log_is_rebuilt(tmp_path):
+    first = FeedbackLoopSystem(str(tmp_path))
+    _collect(first, RATINGS[:7])
+    first.close()
+    # Point the last record into the middle of a line
+    index = bytearray(first.ratings_file.read_bytes())
+    index[-16:-8] = array("d", [first.feedback_file.stat().st_size - 5]).tobytes()
+    first.ratings_file.write_bytes(index)
+
+    system = FeedbackLoopSystem(str(tmp_path))
+    system._seed_state()
+    assert list(system._state['sorted']) == sorted(RATINGS[:7])
+
+
+def test_exit_hook_does_not_keep_systems_alive(tmp_path, monkeypatch):
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS[:1])
+    assert system in feedback_loop_system._live_systems
+    system.close()
+    assert system not in feedback_loop_system._live_systems
+
+    monkeypatch.setattr(FeedbackLoopSystem, "LOG_FLUSH_INTERVAL", 60)
+    unclosed = FeedbackLoopSystem(str(tmp_path))
+    _collect(unclosed, RATINGS[1:3])
+    count = len(feedback_loop_system._live_systems)
+    del unclosed
+    gc.collect()
+    assert len(feedback_loop_system._live_systems) == count - 1
+    assert len(system.feedback_file.read_bytes().splitlines()) == 3
+
+
+def test_rotated_logs_are_summarized(tmp_path, monkeypatch):
+    monkeypatch.setattr(FeedbackLoopSystem, "LOG_ROTATE_BYTES", 300)
+    monkeypatch.setattr(FeedbackLoopSystem, "LOG_FLUSH_LINES", 1)
+    first = FeedbackLoopSystem(str(tmp_path))
+    _collect(first, RATINGS[:9])
+    first.close()
+    assert first._archives
+    assert (tmp_path / "feedback" / "feedback_log.1.jsonl.gz").exists()
+
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS[9:])
+
+    analysis = system.get_analysis()
+    assert analysis["total_feedback"] == len(RATINGS)
+    assert analysis["median_rating"] == statistics.median(RATINGS)
+    assert analysis["trend"]["recent_average"] == statistics.mean(RATINGS[-10:])
+    recent = system.get_recent_feedback(100)
+    assert [entry["rating"] for entry in recent] == RATINGS
+    assert [entry["rating"] for entry in system.get_recent_feedback(7)] == RATINGS[-7:]
+
+
+def test_rotation_summarizes_a_log_without_index(tmp_path, monkeypatch):
+    first = FeedbackLoopSystem(str(tmp_path))
+    _collect(first, RATINGS[:-1])
+    first.close()
+    first.ratings_file.unlink()
+    monkeypatch.setattr(FeedbackLoopSystem, "LOG_ROTATE_BYTES", 100)
+
+    system = FeedbackLoopSystem(str(tmp_path))
+    _collect(system, RATINGS[-1:])
+
+    summary = json.loads((tmp_path / "feedback" / "summary_1.json").read_text())
+    assert summary["count"] == len(RATINGS)
+    assert summary["sum"] == sum(RATINGS)
+    assert summary["recent"] == RATINGS[-10:]
+    analysis = FeedbackLoopSystem(str(tmp_path)).get_analysis()
+    assert analysis["total_feedback"] == len(RATINGS)
+    assert analysis["median_rating"] == statistics.median(RATINGS)
+
+
+def test_lesson_themes_match_whole_words(tmp_path):
+    engine = ContinuousLearningEngine(str(tmp_path))
+    for i in range(5):
+        assert engine.capture_lesson({
+            "task": f"task_{i}",
+            "outcome": "success",
+            "lesson": "Cost checks caught an error; the costume errors did not count"
+        })
+
+    themes = {theme["theme"]: theme["frequency"] for theme in engine.get_patterns()["common_themes"]}
+    assert themes == {"cost": 5, "error": 5}
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for Guardian validation (OpenAI calls replaced by a fake client)
+"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from openai import OpenAIError
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from guardian import Guardian
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions, returning a fixed score"""
+
+    def __init__(self, score):
+        self.score = score
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        content = json.dumps({
+            "overall_score": self.score,
+            "accuracy": self.score,
+            "completeness": self.score,
+            "clarity": self.score,
+            "relevance": self.score,
+            "feedback": "ok",
+            "improvements": ""
+        })
+        call = SimpleNamespace(function=SimpleNamespace(name="score", arguments=content))
+        message = SimpleNamespace(content=None, tool_calls=[call])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_guardian(monkeypatch, score=90):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    guardian = Guardian()
+    completions = FakeCompletions(score)
+    guardian.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return guardian, completions
+
+
+def test_repeated_validation_is_cached(monkeypatch):
+    guardian, completions = make_guardian(monkeypatch)
+
+    first = guardian.validate("output", "task")
+    second = guardian.validate("output", "task")
+
+    assert len(completions.calls) == 1
+    assert completions.calls[0]["tool_choice"]["function"]["name"] == "score"
+    assert second["score"] == first["score"] == 90
+    assert second["cost"] == 0 and first["cost"] == 0.01
+
+    guardian.validate("output", "another task")
+    assert len(completions.calls) == 2
+
+
+def test_failed_validation_is_not_cached(monkeypatch):
+    guardian, completions = make_guardian(monkeypatch)
+    completions.create = lambda **kwargs: 1 / 0
+
+    assert "error" in guardian.validate("output", "task")
+    assert guardian._cache == {}
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    """Async counterpart of FakeCompletions"""
+
+    async def create(self, **kwargs):
+        return FakeCompletions.create(self, **kwargs)
+
+
+def test_validate_batch_keeps_item_order(monkeypatch):
+    guardian, _ = make_guardian(monkeypatch)
+    completions = FakeAsyncCompletions(70)
+
+    async def close():
+        pass
+
+    guardian._aclient = SimpleNamespace(chat=SimpleNamespace(completions=completions), close=close)
+
+    results = guardian.validate_batch([
+        {"output": "a", "task": "task"},
+        {"output": "b", "task": "task"},
+    ])
+
+    assert [result["score"] for result in results] == [70, 70]
+    assert not any(result["passed"] for result in results)
+    assert len(completions.calls) == 2
+    assert guardian._aclient is None
+
+
+def test_long_output_is_truncated_in_prompt(monkeypatch):
+    guardian, completions = make_guardian(monkeypatch)
+    output = "head " + "x" * 100000 + " tail"
+
+    guardian.validate(output, "task")
+
+    prompt = completions.calls[0]["messages"][1]["content"]
+    assert "[TRUNCATED]" in prompt
+    assert "head" in prompt and "tail" in prompt
+    assert len(prompt) < len(output) // 2
+
+
+def test_failed_improvement_loop_does_not_revalidate(monkeypatch):
+    guardian, completions = make_guardian(monkeypatch, score=50)
+    improved = SimpleNamespace(content="improved output", tool_calls=None)
+    original_create = completions.create
+
+    def create(**kwargs):
+        if "tools" not in kwargs:
+            completions.calls.append(kwargs)
+            return SimpleNamespace(choices=[SimpleNamespace(message=improved)])
+        return original_create(**kwargs)
+
+    completions.create = create
+
+    result = guardian.validate_and_improve("output", "task", max_iterations=2)
+
+    # validate, improve, validate -- no extra final validation
+    assert len(completions.calls) == 3
+    assert result["output"] == "improved output"
+    assert result["score"] == 50
+    assert result["total_cost"] == 0.01 + 0.02 + 0.01
+    assert "warning" in result
+
+
+def test_instances_share_one_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(Guardian, "_shared_client", None)
+
+    first, second = Guardian(), Guardian()
+    assert first.client is second.client is Guardian._get_client()
+
+    second.client = SimpleNamespace()
+    assert second.client is not first.client
+
+
+def test_missing_api_key_fails_at_construction(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with pytest.raises(OpenAIError):
+        Guardian()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazy enforcement finder
+"""
+
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import manus_lazy_loader
+
+
+def _failing_enforcer(calls):
+    module = types.ModuleType("core.auto_enforcer")
+
+    def activate_enforcement():
+        calls.append(list(sys.meta_path))
+        raise RuntimeError("activation failed")
+
+    module.activate_enforcement = activate_enforcement
+    return module
+
+
+def test_failed_activation_does_not_break_the_import(monkeypatch, caplog):
+    calls = []
+    monkeypatch.setitem(sys.modules, "core.auto_enforcer", _failing_enforcer(calls))
+    monkeypatch.setattr(sys, "meta_path", list(sys.meta_path))
+    manus_lazy_loader.install()
+    finder = sys.meta_path[0]
+
+    assert finder.find_spec("core.anything", [manus_lazy_loader.CORE_DIR]) is None
+
+    assert len(calls) == 1
+    assert finder not in calls[0]  # removed before activating
+    assert finder not in sys.meta_path
+    assert "activation failed" in caplog.text
+    assert finder.find_spec("core.anything", [manus_lazy_loader.CORE_DIR]) is None
+    assert len(calls) == 1